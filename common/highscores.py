@@ -0,0 +1,168 @@
+import atexit
+import heapq
+import json
+import os
+import threading
+
+LOG_SUFFIX = ".log"
+SEQ_KEY = "_seq"
+
+
+class HighScores:
+    """In-memory high-score tables with write-behind persistence.
+
+    The JSON snapshot at ``path`` is read once. Each table keeps its best ``limit``
+    entries in a min-heap, so ``qualifies`` is O(1). New scores are queued and
+    appended to ``path + ".log"`` by a background thread. Once the log grows past
+    ``compact_every`` lines, the thread writes a fresh snapshot atomically (temp
+    file + ``os.replace``) and truncates the log.
+    """
+
+    def __init__(self, path, tables, limit=5, compact_every=64, flush_interval=1.0):
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.tables = list(tables)
+        self.limit = limit
+        self.compact_every = compact_every
+        self.flush_interval = flush_interval
+
+        self.heaps = {table: [] for table in self.tables}
+        self.sorted = {}
+        self.order = 0
+        self.seq = 0
+        self.pending = []
+        self.log_lines = 0
+        self.lock = threading.Lock()
+        self.io_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+
+        self._load()
+        self.writer = threading.Thread(target=self._write_behind, name="highscores", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    # --- Queries ---
+
+    def qualifies(self, table, score):
+        heap = self.heaps[table]
+        return len(heap) < self.limit or score > heap[0][0]
+
+    def top(self, table):
+        # Best first; among equal scores the earlier entry ranks higher.
+        entries = self.sorted.get(table)
+        if entries is None:
+            # Under the lock so an add() can't invalidate the cache mid-fill.
+            with self.lock:
+                entries = self._ranked(table)
+                self.sorted[table] = entries
+        return entries
+
+    def _ranked(self, table):
+        return [entry for _, _, entry in sorted(self.heaps[table], key=lambda item: (-item[0], -item[1]))]
+
+    # --- Updates ---
+
+    def add(self, table, name, score, **extra):
+        entry = {"name": name, "score": score, **extra}
+        with self.lock:
+            if not self._insert(table, entry):
+                return False
+            self.seq += 1
+            self.pending.append(json.dumps({"seq": self.seq, "table": table, **entry}))
+        self.wake.set()
+        return True
+
+    def _insert(self, table, entry):
+        heap = self.heaps[table]
+        self.order += 1
+        # Newer entries lose ties, so they sort lower in the min-heap.
+        item = (entry["score"], -self.order, entry)
+        if len(heap) < self.limit:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+        else:
+            return False
+        self.sorted.pop(table, None)  # callers hold self.lock (or run before the writer starts)
+        return True
+
+    # --- Persistence ---
+
+    def _load(self):
+        snapshot_seq = 0
+        try:
+            with open(self.path, "r") as file:
+                snapshot = json.load(file)
+        except (FileNotFoundError, ValueError):
+            snapshot = {}
+        if isinstance(snapshot, list):
+            snapshot = {self.tables[0]: snapshot}  # older single-table files
+        snapshot_seq = snapshot.get(SEQ_KEY, 0)
+        for table in self.tables:
+            for entry in snapshot.get(table, []):
+                self._insert(table, entry)
+
+        self.seq = snapshot_seq
+        try:
+            with open(self.log_path, "r") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn write at the end of the log
+                    self.log_lines += 1
+                    seq = record.pop("seq", 0)
+                    table = record.pop("table", None)
+                    if seq <= snapshot_seq or table not in self.heaps:
+                        continue  # already folded into the snapshot
+                    self._insert(table, record)
+                    self.seq = max(self.seq, seq)
+        except FileNotFoundError:
+            pass
+
+    def _write_behind(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self._flush()
+            if self.closed:
+                return
+
+    def _flush(self):
+        with self.io_lock:
+            with self.lock:
+                lines, self.pending = self.pending, []
+            if lines:
+                with open(self.log_path, "a") as file:
+                    file.write("\n".join(lines) + "\n")
+                self.log_lines += len(lines)
+            if self.log_lines >= self.compact_every or (self.closed and self.log_lines):
+                self._compact()
+
+    def _compact(self):
+        with self.lock:
+            # Straight from the heaps: the writer never touches the readers' cache.
+            snapshot = {table: self._ranked(table) for table in self.tables}
+            snapshot[SEQ_KEY] = self.seq
+            self.pending = []  # already part of the snapshot
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(snapshot, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        # Anything left in the log is at or below the snapshot's seq and is skipped
+        # on load, so a crash before this truncation loses nothing.
+        open(self.log_path, "w").close()
+        self.log_lines = 0
+
+    def flush(self):
+        self._flush()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.wake.set()
+        self.writer.join()
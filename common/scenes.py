@@ -0,0 +1,101 @@
+import pygame
+
+# Returned from a scene to end the program.
+QUIT = object()
+
+# Event-driven scenes wake at least this often even with no input (ms).
+IDLE_TIMEOUT = 1000
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.VIDEORESIZE)
+
+
+class Scene:
+    # One screen of a game: a menu, the board, a pause overlay, ... The manager
+    # feeds it events, then calls update and draw once per frame. handle_event and
+    # update return the scene to switch to, QUIT, or None to stay.
+    #
+    # With fps = None the scene is event-driven: the manager sleeps until an
+    # event (or IDLE_TIMEOUT) and only calls draw after something set dirty.
+    fps = 30
+    dirty = True
+
+    def enter(self, manager):
+        pass
+
+    def leave(self):
+        # Release what the scene holds (connections, workers) once it is done
+        # for good. The manager doesn't call it, since a scene left for an
+        # overlay comes back; whoever ends the scene does.
+        pass
+
+    def handle_event(self, event):
+        return None
+
+    def update(self):
+        return None
+
+    def draw(self, window):
+        pass
+
+
+class SceneManager:
+    """Single loop that drives every scene as an explicit state.
+
+    Switching scenes replaces the current one instead of calling into it, so
+    replays and menu round-trips never grow the stack, and the previous scene's
+    boards and surfaces can be freed unless the new scene keeps a reference (e.g.
+    a pause overlay holding the game it resumes).
+    """
+
+    def __init__(self, window, scene, resizable=False):
+        self.window = window
+        self.resizable = resizable
+        self.scene = None
+        self.clock = pygame.time.Clock()
+        self.switch(scene)
+
+    def switch(self, scene):
+        self.scene = scene
+        if scene is not QUIT:
+            scene.dirty = True
+            scene.enter(self)
+
+    def events(self):
+        if self.scene.fps is not None:
+            return pygame.event.get()
+        event = pygame.event.wait(IDLE_TIMEOUT)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def set_mode(self, size):
+        flags = pygame.RESIZABLE if self.resizable else 0
+        self.window = pygame.display.set_mode(size, flags)
+        return self.window
+
+    def run(self):
+        while self.scene is not QUIT:
+            for event in self.events():
+                if event.type == pygame.QUIT:
+                    return
+                if event.type == pygame.VIDEORESIZE and self.resizable:
+                    self.set_mode((event.w, event.h))
+                if event.type in EXPOSE_EVENTS:
+                    self.scene.dirty = True
+                next_scene = self.scene.handle_event(event)
+                if next_scene is not None:
+                    self.switch(next_scene)
+                    if next_scene is QUIT:
+                        return
+
+            next_scene = self.scene.update()
+            if next_scene is not None:
+                self.switch(next_scene)
+                continue
+
+            if self.scene.fps is None:
+                if self.scene.dirty:
+                    self.scene.dirty = False
+                    self.scene.draw(self.window)
+                continue
+            self.scene.draw(self.window)
+            self.clock.tick(self.scene.fps)
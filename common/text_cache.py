@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+import pygame
+
+# Rendered strings kept per game; menus and HUDs use a few dozen.
+DEFAULT_LIMIT = 256
+
+
+class TextCache:
+    """Rendered text surfaces and font handles, shared by every screen of a game.
+
+    ``render`` returns the same surface for the same (font, text, color,
+    antialias, background), so a menu redrawn every frame costs blits instead
+    of rasterizing each string again. Entries are kept in LRU order and the
+    oldest is dropped past ``limit``, so changing text (scores, a name being
+    typed) can't grow it without bound. Returned surfaces are shared: blit
+    them, don't draw on them, and don't restyle a font (``set_bold``, ...)
+    after rendering with it.
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.limit = limit
+        self.surfaces = OrderedDict()
+        self.fonts = {}
+
+    def font(self, name, size, sysfont=False):
+        # pygame.font.SysFont scans the system fonts on every call, so open each once.
+        key = (name, size, sysfont)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size) if sysfont else pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, font, text, color, antialias=True, background=None):
+        # Through pygame.Color so (255, 255, 255), (255, 255, 255, 255) and "white" share an entry.
+        key = (font, text, tuple(pygame.Color(color)), antialias,
+               background if background is None else tuple(pygame.Color(background)))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color, background)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.limit:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.fonts.clear()
+
+
+# One cache per process; each game only ever runs on its own.
+text_cache = TextCache()
+get_font = text_cache.font
+render_text = text_cache.render
@@ -0,0 +1,246 @@
+import argparse
+import math
+import mmap
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+from physics import (
+    BIRD_RADIUS, BIRD_X, DIFFICULTIES, FLAP_STRENGTH, HEIGHT, PIPE_GAP_HARD, PIPE_MARGIN, PIPE_SPEED, PIPE_WIDTH,
+    WIDTH, World,
+)
+
+# --- Format ---
+# Header: magic, version, then the physics the table was built for (gap,
+# gravity, flap strength, pipe speed, bird radius) and the grid shape. Body: a
+# 2-bit action for every (ticks to clear the pipe, height cell, velocity step),
+# 4 per byte, lowest bits first. A header that no longer matches physics.py
+# means the table is stale and gets rebuilt.
+MAGIC = b"FBAP"
+VERSION = 2
+HEADER = struct.Struct("<4sBHfhBBfhHHH")
+EXTENSION = ".fap"
+
+DOOMED, GLIDE, FLAP = 0, 1, 2
+
+# Grid. Height is the bird's y minus the top of the next bottom pipe, in
+# half-pixel cells covering every height the game allows; velocity is
+# FLAP_STRENGTH + n * gravity, which is exact once the bird has flapped;
+# distance is whole ticks until the pipe is behind the bird.
+CELL = 0.5
+H_MIN = -(HEIGHT - PIPE_MARGIN)
+H_CELLS = int((2 * (HEIGHT - PIPE_MARGIN) - PIPE_GAP_HARD) / CELL)
+D_STEPS = 140
+MARGIN = CELL / 2  # covers rounding to a cell when gravity isn't a multiple of CELL
+
+
+def default_path(difficulty):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets",
+                        f"autopilot_{difficulty.lower()}{EXTENSION}")
+
+
+def velocity_steps(gravity):
+    # Enough velocity steps for a fall from the top of the screen to the bottom.
+    return math.ceil((math.sqrt(2 * gravity * HEIGHT) - FLAP_STRENGTH) / gravity) + 1
+
+
+def header_for(difficulty):
+    gap, gravity = DIFFICULTIES[difficulty]
+    return HEADER.pack(MAGIC, VERSION, gap, gravity, FLAP_STRENGTH, PIPE_SPEED, BIRD_RADIUS,
+                       CELL, H_MIN, H_CELLS, velocity_steps(gravity), D_STEPS)
+
+
+def ticks_to_clear(pipe_x):
+    # Ticks until a pipe at ``pipe_x`` no longer reaches the bird's column.
+    return max(0, math.ceil((pipe_x + PIPE_WIDTH - (BIRD_X - BIRD_RADIUS)) / PIPE_SPEED))
+
+
+def pipe_x_at(ticks):
+    # The pipe x that is ``ticks`` from clearing. Pipes spawn at WIDTH and move
+    # PIPE_SPEED a tick, so every pipe passes through the same x positions.
+    clear_x = BIRD_X - BIRD_RADIUS - PIPE_WIDTH
+    x = clear_x + (WIDTH - clear_x) % PIPE_SPEED
+    return x + (ticks - 1) * PIPE_SPEED if x > clear_x else x + ticks * PIPE_SPEED
+
+
+# --- Generation ---
+
+def solve(difficulty):
+    """Safe actions for every grid state, as a (D_STEPS, H_CELLS, velocity steps) array.
+
+    Backward induction from the tick the pipe is cleared: a state is viable if
+    gliding or flapping leads, without touching the pipe, to a viable state one
+    tick closer. Contact is judged with the bird's bounding box, which is
+    stricter than the game's circle test. With gravity a multiple of CELL
+    (Medium and Hard) every height the bird can have is a cell, so nothing is
+    rounded; at Easy heights are rounded to a cell and MARGIN absorbs the error.
+    """
+    gap, gravity = DIFFICULTIES[difficulty]
+    v_steps = velocity_steps(gravity)
+    h = H_MIN + CELL * np.arange(H_CELLS, dtype=np.float64)[:, None]
+    n = np.arange(v_steps)[None, :]
+    values = np.empty((D_STEPS, H_CELLS, v_steps), dtype=np.uint8)
+    values[0] = GLIDE  # pipe already behind the bird
+    viable = np.ones((H_CELLS, v_steps), dtype=bool)
+
+    below_top = h - BIRD_RADIUS - MARGIN >= -gap
+    above_bottom = h + BIRD_RADIUS + MARGIN <= 0
+    for ticks in range(1, D_STEPS):
+        # Collision is swept over the tick, so if the pipe reaches the bird's
+        # column at either end of it, both ends must be clear of the pipe.
+        in_column = (pipe_x_at(ticks) < BIRD_X + BIRD_RADIUS
+                     or ticks > 1 and pipe_x_at(ticks - 1) < BIRD_X + BIRD_RADIUS)
+        safe = []
+        for after in (n + 1, np.ones_like(n)):  # glide, flap
+            moved = h + (FLAP_STRENGTH + after * gravity)
+            cell = np.rint((moved - H_MIN) / CELL).astype(np.int64)
+            ok = (after < v_steps) & (cell >= 0) & (cell < H_CELLS)
+            if in_column:
+                ok &= below_top & above_bottom
+                ok &= (moved + BIRD_RADIUS + MARGIN <= 0) & (moved - BIRD_RADIUS - MARGIN >= -gap)
+            cell = np.clip(cell, 0, H_CELLS - 1)
+            after = np.broadcast_to(np.minimum(after, v_steps - 1), cell.shape)
+            ok &= viable[cell, after]
+            safe.append(ok)
+        glide, flap = safe
+        values[ticks] = np.where(glide, GLIDE, np.where(flap, FLAP, DOOMED))
+        viable = glide | flap
+    return values
+
+
+def pack(values):
+    values = np.ascontiguousarray(values, dtype=np.uint8).ravel()
+    values = np.concatenate([values, np.zeros(-len(values) % 4, dtype=np.uint8)]).reshape(-1, 4)
+    return (values[:, 0] | values[:, 1] << 2 | values[:, 2] << 4 | values[:, 3] << 6).tobytes()
+
+
+def write(path, difficulty, values):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(header_for(difficulty))
+        file.write(pack(values))
+    os.replace(tmp, path)
+
+
+def generate(difficulty, path=None):
+    path = path or default_path(difficulty)
+    write(path, difficulty, solve(difficulty))
+    return path
+
+
+# --- Lookup ---
+
+class Autopilot:
+    """Flap decisions for one difficulty from a generated table file.
+
+    The file is memory-mapped on the first decision; a decision is a handful of
+    arithmetic and one byte read.
+    """
+
+    def __init__(self, path, difficulty):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+        if header != header_for(difficulty):
+            raise ValueError("autopilot table is for different physics")
+        self.pipe_gap, self.gravity = DIFFICULTIES[difficulty]
+        self.v_steps = velocity_steps(self.gravity)
+        self.data = None
+
+    def action(self, bird_y, velocity, pipe_x, gap_bottom):
+        # DOOMED / GLIDE / FLAP for a bird against a pipe at ``pipe_x``.
+        if self.data is None:
+            with open(self.path, "rb") as file:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        ticks = min(ticks_to_clear(pipe_x), D_STEPS - 1)
+        cell = round((bird_y - gap_bottom - H_MIN) / CELL)
+        step = round((velocity - FLAP_STRENGTH) / self.gravity)
+        if not (0 <= cell < H_CELLS and 0 <= step < self.v_steps):
+            return DOOMED
+        key = (ticks * H_CELLS + cell) * self.v_steps + step
+        return self.data[HEADER.size + (key >> 2)] >> 2 * (key & 3) & 3
+
+    def decide(self, world):
+        """Whether ``world``'s bird should flap before the next tick."""
+        pipes = world.pipes
+        slot = pipes.next_pipe()
+        if slot < 0:
+            # No pipe yet: aim for a gap in the middle of the screen.
+            pipe_x, gap_bottom = WIDTH, (HEIGHT + self.pipe_gap) // 2
+        else:
+            pipe_x, gap_bottom = pipes.x_at(slot), pipes.bottom[slot]
+        y, velocity = world.bird_y, world.velocity
+        action = self.action(y, velocity, pipe_x, gap_bottom)
+        if action == DOOMED:
+            flap = y > gap_bottom - self.pipe_gap / 2  # no safe move: head for the gap
+        else:
+            flap = action == FLAP
+        # The table only knows about the pipe; keep off the floor and ceiling too.
+        if y + velocity + self.gravity + BIRD_RADIUS >= HEIGHT - 1:
+            return True
+        if flap and y + FLAP_STRENGTH + self.gravity - BIRD_RADIUS <= 1:
+            return False
+        return flap
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+def load(difficulty, generate_missing=False):
+    # The table for this difficulty, or None if there isn't a current one.
+    # Building one takes about a second, so the game can do it on first use.
+    path = default_path(difficulty)
+    try:
+        return Autopilot(path, difficulty)
+    except (OSError, ValueError):
+        if not generate_missing:
+            return None
+    generate(difficulty, path)
+    return Autopilot(path, difficulty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Flappy Bird autopilot tables and soak-test them headless")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), action="append",
+                        help="difficulties to build/test (default: all)")
+    parser.add_argument("--ticks", type=int, default=0, help="also fly this many ticks per difficulty")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for difficulty in args.difficulty or list(DIFFICULTIES):
+        start = time.perf_counter()
+        path = generate(difficulty)
+        print(f"{difficulty}: built {path} ({os.path.getsize(path) / 1e6:.1f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+        if not args.ticks:
+            continue
+        pilot = Autopilot(path, difficulty)
+        world = World(difficulty, random.Random(args.seed))
+        deaths = best = flaps = 0
+        thinking = 0.0
+        clock = time.perf_counter
+        for _ in range(args.ticks):
+            started = clock()
+            flap = pilot.decide(world)
+            thinking += clock() - started
+            if flap:
+                world.flap()
+                flaps += 1
+            world.step()
+            if world.over:
+                deaths += 1
+                best = max(best, world.score)
+                world = World(difficulty, world.rng)
+        best = max(best, world.score)
+        print(f"  {args.ticks:,} ticks ({args.ticks / 3600:.0f} min of play): {deaths} deaths, "
+              f"best run {best} pipes, {flaps:,} flaps, {1e6 * thinking / args.ticks:.2f} us per decision")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,4 @@
 import pygame
-import random
-import json
 import os
 import sys
 
@@ -15,20 +13,20 @@ score_music = os.path.join(BASE_DIR, "assets", "score.wav")
 high_score_file = os.path.join(BASE_DIR, "assets", "highscores.json")
 
 # Constants
-WIDTH, HEIGHT = 400, 600
-FPS = 60
-PIPE_WIDTH = 70
-PIPE_GAP_HARD = 150
-PIPE_GAP_MEDIUM = 180
-PIPE_GAP_EASY = 220
-GRAVITY_HARD = 0.5
-GRAVITY_EASY = 0.35
-FLAP_STRENGTH = -10
-PIPE_SPEED = 3
-BIRD_RADIUS = 20
+from physics import BIRD_RADIUS, BIRD_X, FPS, HEIGHT, PIPE_WIDTH, TICK, WIDTH, World
+RENDER_FPS = 144  # frame cap; physics still ticks at FPS
+MAX_FRAME_TIME = 0.25  # after a stall, catch up at most this much game time
+REWIND_TICKS = 3 * FPS  # how far Backspace goes back
 FONT_NAME = pygame.font.get_default_font()
 HIGHSCORE_FILE = high_score_file
 
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from common.highscores import HighScores
+from common.scenes import EXPOSE_EVENTS
+from common.text_cache import render_text
+import autopilot
+from rewind import RewindBuffer
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -60,37 +58,74 @@ except:
     pass
 
 # Highscore Handling
-def load_highscores():
-    if not os.path.exists(HIGHSCORE_FILE):
-        with open(HIGHSCORE_FILE, 'w') as f:
-            json.dump([], f)
-    with open(HIGHSCORE_FILE, 'r') as f:
-        return json.load(f)
-
-def save_highscores(scores):
-    with open(HIGHSCORE_FILE, 'w') as f:
-        json.dump(scores[:5], f)
-
-def draw_bird(window, bird_y):
-    pygame.draw.circle(window, BLUE, (80, int(bird_y)), BIRD_RADIUS)
-
-def draw_pipes(window, pipes):
-    for pipe in pipes:
-        pygame.draw.rect(window, GREEN, pygame.Rect(pipe['x'], 0, PIPE_WIDTH, pipe['top']))
-        pygame.draw.rect(window, GREEN, pygame.Rect(pipe['x'], pipe['bottom'], PIPE_WIDTH, HEIGHT - pipe['bottom']))
-
-def check_collision(bird_y, pipes):
-    if bird_y + BIRD_RADIUS >= HEIGHT or bird_y - BIRD_RADIUS <= 0:
-        return True
-    for pipe in pipes:
-        if 80 + BIRD_RADIUS > pipe['x'] and 80 - BIRD_RADIUS < pipe['x'] + PIPE_WIDTH:
-            if bird_y - BIRD_RADIUS < pipe['top'] or bird_y + BIRD_RADIUS > pipe['bottom']:
-                return True
-    return False
+# Loaded once; new scores are written behind in the background.
+high_scores = HighScores(HIGHSCORE_FILE, ["scores"], limit=5)
+
+# --- Rendering ---
+
+class GameRenderer:
+    """Draws the play field from prebuilt sprites and pushes only what moved.
+
+    Each frame the last frame's sprite rects and the score are painted over
+    with the background and everything is blitted again, which is a handful
+    of blits; only the old and new sprite rects (and the score when it
+    changes) go to the display, since nothing else can differ.
+    ``invalidate()`` forces one full redraw, for the first frame and after
+    anything else has drawn over the window.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.pipe = pygame.Surface((PIPE_WIDTH, HEIGHT)).convert()
+        self.pipe.fill(GREEN)
+        self.bird = pygame.Surface((2 * BIRD_RADIUS, 2 * BIRD_RADIUS), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.circle(self.bird, BLUE, (BIRD_RADIUS, BIRD_RADIUS), BIRD_RADIUS)
+        self.score = None
+        self.score_surface = None
+        self.score_rect = pygame.Rect(0, 0, 0, 0)
+        self.sprite_rects = []
+        self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def draw(self, world, alpha):
+        window = self.window
+        if self.full:
+            window.fill(WHITE)
+        else:
+            for rect in self.sprite_rects:
+                window.fill(WHITE, rect)
+            window.fill(WHITE, self.score_rect)
+
+        rects = []
+        shift = world.pipe_shift(alpha)
+        for x, top, bottom in world.pipes:
+            x = round(x + shift)
+            rects.append(window.blit(self.pipe, (x, 0), (0, 0, PIPE_WIDTH, top)))
+            rects.append(window.blit(self.pipe, (x, bottom), (0, 0, PIPE_WIDTH, HEIGHT - bottom)))
+        rects.append(window.blit(self.bird, (BIRD_X - BIRD_RADIUS, round(world.bird_y_at(alpha)) - BIRD_RADIUS)))
+
+        dirty = self.sprite_rects + rects
+        changed = world.score != self.score
+        if changed:
+            self.score = world.score
+            self.score_surface = title_font.render(str(world.score), True, BLACK)
+            dirty.append(self.score_rect)
+        self.score_rect = window.blit(self.score_surface, (WIDTH // 2 - self.score_surface.get_width() // 2, 20))
+        if changed:
+            dirty.append(self.score_rect)
+
+        if self.full:
+            pygame.display.update()
+            self.full = False
+        else:
+            pygame.display.update(dirty)
+        self.sprite_rects = rects
 
 def pause_game(window, clock):
     paused = True
-    pause_text = title_font.render("Paused", True, BLACK)
+    pause_text = render_text(title_font, "Paused", BLACK)
     window.blit(pause_text, (WIDTH // 2 - pause_text.get_width() // 2, HEIGHT // 2 - 50))
     pygame.display.update()
     while paused:
@@ -98,6 +133,8 @@ def pause_game(window, clock):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
+            elif event.type in EXPOSE_EVENTS:
+                pygame.display.update()
             elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
                 paused = False
 
@@ -107,8 +144,8 @@ def get_player_name(window, clock):
     while entering:
         clock.tick(FPS)
         window.fill(WHITE)
-        prompt = small_font.render("New High Score! Enter your name:", True, BLACK)
-        name_text = title_font.render(name, True, BLUE)
+        prompt = render_text(small_font, "New High Score! Enter your name:", BLACK)
+        name_text = render_text(title_font, name, BLUE)
         window.blit(prompt, (WIDTH // 2 - prompt.get_width() // 2, HEIGHT // 3))
         window.blit(name_text, (WIDTH // 2 - name_text.get_width() // 2, HEIGHT // 2))
         pygame.display.update()
@@ -125,16 +162,16 @@ def get_player_name(window, clock):
     return name
 
 def display_highscores(window):
-    scores = load_highscores()
+    scores = high_scores.top("scores")
     showing = True
     while showing:
         window.fill(WHITE)
-        title = title_font.render("High Scores", True, BLACK)
+        title = render_text(title_font, "High Scores", BLACK)
         window.blit(title, (WIDTH // 2 - title.get_width() // 2, 50))
         for i, score in enumerate(scores):
-            score_text = menu_font.render(f"{i+1}. {score['name']} - {score['score']}", True, BLUE)
+            score_text = render_text(menu_font, f"{i+1}. {score['name']} - {score['score']}", BLUE)
             window.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 120 + i * 40))
-        back_text = small_font.render("Press ESC to return", True, GREY)
+        back_text = render_text(small_font, "Press ESC to return", GREY)
         window.blit(back_text, (10, HEIGHT - 30))
         pygame.display.update()
         for event in pygame.event.get():
@@ -149,11 +186,11 @@ def select_difficulty(window):
     choosing = True
     while choosing:
         window.fill(WHITE)
-        title = title_font.render("Select Difficulty", True, BLACK)
+        title = render_text(title_font, "Select Difficulty", BLACK)
         window.blit(title, (WIDTH // 2 - title.get_width() // 2, 80))
         for i, option in enumerate(options):
             color = RED if i == selected else BLACK
-            text = menu_font.render(option, True, color)
+            text = render_text(menu_font, option, color)
             window.blit(text, (WIDTH // 2 - text.get_width() // 2, 200 + i * 60))
         pygame.display.update()
         for event in pygame.event.get():
@@ -171,22 +208,29 @@ def game_over_screen(window, clock, score):
     rect_width, rect_height = 300, 180
     rect_x = WIDTH // 2 - rect_width // 2
     rect_y = HEIGHT // 2 - rect_height // 2
+    # Nothing on this screen changes, so draw it once and only wait for keys.
+    pygame.draw.rect(window, BLACK, (rect_x, rect_y, rect_width, rect_height))
+    over = render_text(menu_font, "Game Over!!", YELLOW)
+    again = render_text(small_font, "Press R to Play Again", YELLOW)
+    rewind = render_text(small_font, "Backspace to Rewind", YELLOW)
+    quit_ = render_text(small_font, "Press ESC to Exit", YELLOW)
+    window.blit(over, (WIDTH // 2 - over.get_width() // 2, rect_y + 20))
+    window.blit(again, (WIDTH // 2 - again.get_width() // 2, rect_y + 65))
+    window.blit(rewind, (WIDTH // 2 - rewind.get_width() // 2, rect_y + 100))
+    window.blit(quit_, (WIDTH // 2 - quit_.get_width() // 2, rect_y + 135))
+    pygame.display.update()
     while True:
         clock.tick(FPS)
-        pygame.draw.rect(window, BLACK, (rect_x, rect_y, rect_width, rect_height))
-        over = menu_font.render("Game Over!!", True, YELLOW)
-        again = small_font.render("Press R to Play Again", True, YELLOW)
-        quit_ = small_font.render("Press ESC to Exit", True, YELLOW)
-        window.blit(over, (WIDTH // 2 - over.get_width() // 2, rect_y + 20))
-        window.blit(again, (WIDTH // 2 - again.get_width() // 2, rect_y + 70))
-        window.blit(quit_, (WIDTH // 2 - quit_.get_width() // 2, rect_y + 110))
-        pygame.display.update()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
+            elif event.type in EXPOSE_EVENTS:
+                pygame.display.update()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
                     return "restart"
+                elif event.key == pygame.K_BACKSPACE:
+                    return "rewind"
                 elif event.key == pygame.K_ESCAPE:
                     return "menu"
 
@@ -195,11 +239,11 @@ def main_menu(window):
     options = ["Play", "View High Scores", "Quit"]
     while True:
         window.fill(WHITE)
-        title = title_font.render("Flappy Bird", True, BLUE)
+        title = render_text(title_font, "Flappy Bird", BLUE)
         window.blit(title, (WIDTH // 2 - title.get_width() // 2, 80))
         for i, option in enumerate(options):
             color = RED if i == selected else BLACK
-            text = menu_font.render(option, True, color)
+            text = render_text(menu_font, option, color)
             window.blit(text, (WIDTH // 2 - text.get_width() // 2, 200 + i * 60))
         pygame.display.update()
         for event in pygame.event.get():
@@ -220,81 +264,80 @@ def main_menu(window):
 
 def game_loop(window, difficulty):
     clock = pygame.time.Clock()
-    bird_y = HEIGHT // 2
-    bird_velocity = 0
-    pipes = []
-    spawn_timer = 0
-    score = 0
-
-    if difficulty == "Easy":
-        pipe_gap = PIPE_GAP_EASY
-        gravity = GRAVITY_EASY
-    elif difficulty == "Medium":
-        pipe_gap = PIPE_GAP_MEDIUM
-        gravity = GRAVITY_HARD
-    else:
-        pipe_gap = PIPE_GAP_HARD
-        gravity = GRAVITY_HARD
+    world = World(difficulty)
+    renderer = GameRenderer(window)
+    pilot = None  # press A to let the autopilot fly; its scores aren't recorded
+    history = RewindBuffer()  # Backspace rewinds, which also keeps the score off the table
+    history.record(world)
+    assisted = flapped = False
+    lag = 0.0
 
     pygame.mixer.music.play(-1)
 
     while True:
-        clock.tick(FPS)
-        window.fill(WHITE)
-
-        # Bird physics
-        bird_velocity += gravity
-        bird_y += bird_velocity
-
-        # Pipe logic
-        spawn_timer += 1
-        if spawn_timer > 90:
-            top = random.randint(50, HEIGHT - pipe_gap - 50)
-            bottom = top + pipe_gap
-            pipes.append({'x': WIDTH, 'top': top, 'bottom': bottom})
-            spawn_timer = 0
+        # Physics runs in fixed ticks; rendering runs as fast as RENDER_FPS allows.
+        lag += min(clock.tick(RENDER_FPS) / 1000, MAX_FRAME_TIME)
 
-        for pipe in pipes:
-            pipe['x'] -= PIPE_SPEED
-        pipes = [p for p in pipes if p['x'] + PIPE_WIDTH > 0]
-
-        draw_pipes(window, pipes)
-        draw_bird(window, bird_y)
-
-        for pipe in pipes:
-            if pipe['x'] + PIPE_WIDTH < 80 and not pipe.get('scored'):
-                pipe['scored'] = True
-                score += 1
-                if score_sound: score_sound.play()
-
-        if check_collision(bird_y, pipes):
-            if hit_sound: hit_sound.play()
-            pygame.mixer.music.stop()
-            highscores = load_highscores()
-            if len(highscores) < 5 or score > highscores[-1]['score']:
-                name = get_player_name(window, clock)
-                highscores.append({'name': name, 'score': score})
-                highscores = sorted(highscores, key=lambda x: x['score'], reverse=True)
-                save_highscores(highscores)
-            choice = game_over_screen(window, clock, score)
-            if choice == "restart":
-                return difficulty
-            elif choice == "menu":
-                return None
-
-        score_text = title_font.render(str(score), True, BLACK)
-        window.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 20))
-
-        pygame.display.update()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    bird_velocity = FLAP_STRENGTH
+                    world.flap()
+                    flapped = True
                     if flap_sound: flap_sound.play()
+                elif event.key == pygame.K_BACKSPACE:
+                    history.rewind(world, REWIND_TICKS)
+                    assisted = True
+                    flapped = False
                 elif event.key == pygame.K_p:
                     pause_game(window, clock)
+                    clock.tick()  # don't count the pause as game time
+                    renderer.invalidate()
+                elif event.key == pygame.K_a:
+                    if pilot is None:
+                        pilot = autopilot.load(difficulty, generate_missing=True)
+                        clock.tick()  # building the table can take a second
+                        assisted = True
+                    else:
+                        pilot = None
+                    pygame.display.set_caption("Flappy Bird Clone" + (" (autopilot)" if pilot else ""))
+            elif event.type in EXPOSE_EVENTS:
+                renderer.invalidate()
+
+        while lag >= TICK and not world.over:
+            lag -= TICK
+            if pilot is not None and pilot.decide(world):
+                world.flap()
+                flapped = True
+                if flap_sound: flap_sound.play()
+            if world.step() and score_sound:
+                score_sound.play()
+            history.record(world, flapped)
+            flapped = False
+
+        renderer.draw(world, 1.0 if world.over else lag / TICK)
+
+        if world.over:
+            score = world.score
+            if hit_sound: hit_sound.play()
+            pygame.mixer.music.stop()
+            pygame.display.set_caption("Flappy Bird Clone")
+            if not assisted and high_scores.qualifies("scores", score):
+                name = get_player_name(window, clock)
+                high_scores.add("scores", name, score)
+            choice = game_over_screen(window, clock, score)
+            if choice == "restart":
+                return difficulty
+            elif choice == "menu":
+                return None
+            history.rewind(world, REWIND_TICKS)
+            assisted = True
+            lag = 0.0
+            clock.tick()
+            renderer.invalidate()
+            pygame.display.set_caption("Flappy Bird Clone" + (" (autopilot)" if pilot else ""))
+            pygame.mixer.music.play(-1)
 
 def main():
     window = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
@@ -0,0 +1,265 @@
+# Game rules shared by the window (main.py) and the headless simulator; no
+# pygame here so training runs can import it without a display.
+
+import math
+import random
+
+WIDTH, HEIGHT = 400, 600
+FPS = 60  # physics ticks per second; every rule below is per tick
+TICK = 1 / FPS
+PIPE_WIDTH = 70
+PIPE_GAP_HARD = 150
+PIPE_GAP_MEDIUM = 180
+PIPE_GAP_EASY = 220
+GRAVITY_HARD = 0.5
+GRAVITY_EASY = 0.35
+FLAP_STRENGTH = -10
+PIPE_SPEED = 3
+BIRD_RADIUS = 20
+BIRD_X = 80
+SPAWN_INTERVAL = 90  # frames between pipes
+PIPE_MARGIN = 50  # closest a gap gets to the top or bottom edge
+
+# Difficulty -> (pipe gap, gravity)
+DIFFICULTIES = {
+    "Easy": (PIPE_GAP_EASY, GRAVITY_EASY),
+    "Medium": (PIPE_GAP_MEDIUM, GRAVITY_HARD),
+    "Hard": (PIPE_GAP_HARD, GRAVITY_HARD),
+}
+
+
+def new_pipe_top(rng, pipe_gap):
+    return rng.randint(PIPE_MARGIN, HEIGHT - pipe_gap - PIPE_MARGIN)
+
+
+# --- Pipes ---
+
+PIPE_CAPACITY = 8  # a power of two; at most 3 pipes are on screen at the default spacing
+
+
+class PipeRing:
+    """Live pipes, oldest first, in a fixed-size ring of parallel arrays.
+
+    Pipes all scroll together, so each stores the x it spawned at in world
+    coordinates and ``scroll`` says how far the world has moved; moving every
+    pipe is one addition. Because pipes stay in x order, a cursor to the next
+    pipe to score and another to the first pipe still reaching the bird's
+    column make scoring and collision O(1). The cursors assume the bird's
+    column never moves.
+    """
+
+    __slots__ = ("mask", "x", "top", "bottom", "head", "tail", "scored", "near", "scroll")
+
+    def __init__(self, capacity=PIPE_CAPACITY):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.mask = capacity - 1
+        self.x = [0.0] * capacity
+        self.top = [0] * capacity
+        self.bottom = [0] * capacity
+        self.clear()
+
+    def clear(self):
+        # head/tail/scored/near count pipes ever spawned; ``& mask`` gives the slot.
+        self.head = self.tail = self.scored = self.near = 0
+        self.scroll = 0.0
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def __iter__(self):
+        # (x, top, bottom) for drawing, oldest first.
+        for i in range(self.head, self.tail):
+            slot = i & self.mask
+            yield self.x[slot] - self.scroll, self.top[slot], self.bottom[slot]
+
+    def x_at(self, slot):
+        return self.x[slot] - self.scroll
+
+    def spawn(self, top, bottom, x=WIDTH):
+        if self.tail - self.head > self.mask:
+            raise IndexError("pipe ring is full")
+        slot = self.tail & self.mask
+        self.x[slot] = x + self.scroll
+        self.top[slot] = top
+        self.bottom[slot] = bottom
+        self.tail += 1
+
+    def advance(self, dx):
+        # Move every pipe left by ``dx`` and drop the ones fully off screen.
+        self.scroll += dx
+        while self.head < self.tail and self.x[self.head & self.mask] - self.scroll + PIPE_WIDTH <= 0:
+            self.head += 1
+        self.scored = max(self.scored, self.head)
+        self.near = max(self.near, self.head)
+
+    def score(self, bird_x=BIRD_X):
+        # Number of pipes whose right edge passed ``bird_x`` since the last call.
+        passed = 0
+        while self.scored < self.tail and self.x[self.scored & self.mask] - self.scroll + PIPE_WIDTH < bird_x:
+            self.scored += 1
+            passed += 1
+        return passed
+
+    def next_pipe(self, radius=BIRD_RADIUS, bird_x=BIRD_X):
+        # Slot of the first pipe still reaching the bird's column, or -1.
+        while self.near < self.tail and self.x[self.near & self.mask] - self.scroll + PIPE_WIDTH <= bird_x - radius:
+            self.near += 1
+        return self.near & self.mask if self.near < self.tail else -1
+
+    def column(self, dx=0, radius=BIRD_RADIUS, bird_x=BIRD_X):
+        """Broad phase: the pipes whose x-range met the bird's column over the last tick.
+
+        Returns a range of ring indices (``& mask`` gives the slot); ``dx`` is
+        how far the pipes moved in that tick. It starts from the ``near``
+        cursor, so it costs the same however many pipes are live.
+        """
+        self.next_pipe(radius, bird_x)
+        start = self.near
+        while start > self.head and self.x_at((start - 1) & self.mask) + PIPE_WIDTH > bird_x - radius - dx:
+            start -= 1
+        stop = start
+        while stop < self.tail and self.x_at(stop & self.mask) < bird_x + radius:
+            stop += 1
+        return range(start, stop)
+
+    def hits(self, y, prev_y=None, dx=0, radius=BIRD_RADIUS, bird_x=BIRD_X):
+        """Whether the bird touched a pipe moving from ``prev_y`` to ``y`` over the last tick.
+
+        Relative to the pipes, which moved ``dx`` left meanwhile, the bird went
+        in a straight line, and the whole line is tested against each pipe's
+        rects with an exact circle test, so a long tick can't tunnel through a
+        pipe or clip a corner it never touched. Without ``prev_y`` it is the
+        static test at ``y``.
+        """
+        if prev_y is None:
+            prev_y = y
+        for i in self.column(dx, radius, bird_x):
+            slot = i & self.mask
+            left = self.x_at(slot)
+            right = left + PIPE_WIDTH
+            if (sweep_hits_rect(bird_x - dx, prev_y, bird_x, y, radius, left, right, -math.inf, self.top[slot])
+                    or sweep_hits_rect(bird_x - dx, prev_y, bird_x, y, radius, left, right, self.bottom[slot],
+                                       math.inf)):
+                return True
+        return False
+
+
+# --- Collision ---
+
+def _segment_hits_box(x, y, dx, dy, left, right, low, high):
+    # Does (x, y) + t * (dx, dy), 0 <= t <= 1, enter the open box? Slab test;
+    # the box may be unbounded.
+    t0, t1 = 0.0, 1.0
+    for start, delta, lo, hi in ((x, dx, left, right), (y, dy, low, high)):
+        if delta == 0:
+            if not lo < start < hi:
+                return False
+            continue
+        enter, leave = (lo - start) / delta, (hi - start) / delta
+        if enter > leave:
+            enter, leave = leave, enter
+        t0 = max(t0, enter)
+        t1 = min(t1, leave)
+    return t0 < t1
+
+
+def _segment_hits_disc(x, y, dx, dy, cx, cy, radius):
+    # Does the segment come closer than ``radius`` to (cx, cy)?
+    mx, my = x - cx, y - cy
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0 else min(1.0, max(0.0, -(mx * dx + my * dy) / length2))
+    ex, ey = mx + t * dx, my + t * dy
+    return ex * ex + ey * ey < radius * radius
+
+
+def sweep_hits_rect(x0, y0, x1, y1, radius, left, right, low, high):
+    """Whether a circle moving straight from (x0, y0) to (x1, y1) touches a rect.
+
+    That is whether its centre enters the rect grown by ``radius`` with
+    rounded corners: the rect widened by ``radius``, the rect heightened by
+    ``radius``, or a disc on a corner. ``low``/``high`` may be infinite.
+    """
+    dx, dy = x1 - x0, y1 - y0
+    if (_segment_hits_box(x0, y0, dx, dy, left - radius, right + radius, low, high)
+            or _segment_hits_box(x0, y0, dx, dy, left, right, low - radius, high + radius)):
+        return True
+    for cy in (low, high):
+        if math.isfinite(cy):
+            for cx in (left, right):
+                if _segment_hits_disc(x0, y0, dx, dy, cx, cy, radius):
+                    return True
+    return False
+
+
+# --- World ---
+
+class World:
+    """One bird's game, advanced one fixed tick per ``step()``.
+
+    Nothing here knows about wall-clock time: the window runs ``step()`` from
+    an accumulator and draws between the last two ticks with ``bird_y_at``
+    and ``pipe_shift``, while tests and bots can step it as fast as they like.
+    """
+
+    __slots__ = ("pipe_gap", "gravity", "rng", "pipes", "bird_y", "velocity", "spawn_timer", "score", "ticks",
+                 "over", "prev_y", "prev_scroll")
+
+    def __init__(self, difficulty="Medium", rng=None):
+        self.pipe_gap, self.gravity = DIFFICULTIES[difficulty]
+        # A stream of its own: rewinding restores it with setstate(), which
+        # must not touch anyone else's randomness.
+        self.rng = rng if rng is not None else random.Random()
+        self.pipes = PipeRing()
+        self.bird_y = HEIGHT // 2
+        self.velocity = 0
+        self.spawn_timer = 0
+        self.score = 0
+        self.ticks = 0
+        self.over = False
+        self.prev_y = self.bird_y
+        self.prev_scroll = 0.0
+
+    def flap(self):
+        # Takes effect on the next tick, like a key press between frames.
+        self.velocity = FLAP_STRENGTH
+
+    def step(self):
+        """Advance one tick; returns the number of pipes passed (0 or 1)."""
+        self.prev_y = self.bird_y
+        self.prev_scroll = self.pipes.scroll
+        self.ticks += 1
+
+        self.velocity += self.gravity
+        self.bird_y += self.velocity
+
+        self.spawn_timer += 1
+        if self.spawn_timer > SPAWN_INTERVAL:
+            top = new_pipe_top(self.rng, self.pipe_gap)
+            self.pipes.spawn(top, top + self.pipe_gap)
+            self.spawn_timer = 0
+        self.pipes.advance(PIPE_SPEED)
+
+        passed = self.pipes.score()
+        self.score += passed
+        if self.collides():
+            self.over = True
+        return passed
+
+    def collides(self):
+        # Swept over the tick just taken; the bird moves in a straight line
+        # within a tick, so the floor and ceiling only need its end point.
+        y = self.bird_y
+        if y + BIRD_RADIUS >= HEIGHT or y - BIRD_RADIUS <= 0:
+            return True
+        return self.pipes.hits(y, self.prev_y, self.pipes.scroll - self.prev_scroll)
+
+    # Rendering between ticks: ``alpha`` is how far (0..1) we are from the
+    # previous tick to the current one.
+
+    def bird_y_at(self, alpha):
+        return self.prev_y + (self.bird_y - self.prev_y) * alpha
+
+    def pipe_shift(self, alpha):
+        # Added to each pipe's current x to put it where it was at ``alpha``.
+        return (self.pipes.scroll - self.prev_scroll) * (1 - alpha)
@@ -0,0 +1,102 @@
+import math
+import struct
+
+from physics import FPS, PIPE_CAPACITY
+
+# --- Format ---
+# A keyframe is the whole World after a tick: bird, counters, the pipe ring and
+# the RNG's Mersenne Twister state (so pipes spawned after a rewind match the
+# ones you saw). Between keyframes only each tick's input is kept, one byte a
+# tick, and a frame is rebuilt by stepping forward from the keyframe before it,
+# the same way snake replays are verified.
+KEYFRAME = struct.Struct(f"<4dIIIB4Id{PIPE_CAPACITY}d{PIPE_CAPACITY}H{PIPE_CAPACITY}H")
+RNG_STATE = struct.Struct("<625Id")  # random.getstate()[1] and gauss_next (NaN for None)
+RNG_VERSION = 3
+
+
+class RewindBuffer:
+    """The last ``seconds`` of a World, rewindable to any tick.
+
+    Storage is allocated up front and reused: ``record()`` writes one byte per
+    tick plus a keyframe every ``keyframe_every`` ticks, so memory stays fixed
+    (about 60 KB for 10 s) and rewinding replays at most ``keyframe_every``
+    ticks.
+    """
+
+    def __init__(self, seconds=10, keyframe_every=30):
+        self.keyframe_every = keyframe_every
+        self.keyframes = math.ceil(seconds * FPS / keyframe_every) + 1
+        self.ticks = self.keyframes * keyframe_every
+        self.inputs = bytearray(self.ticks)
+        self.frames = bytearray(self.keyframes * KEYFRAME.size)
+        self.rng_states = bytearray(self.keyframes * RNG_STATE.size)
+        self.clear()
+
+    @property
+    def nbytes(self):
+        return len(self.inputs) + len(self.frames) + len(self.rng_states)
+
+    def clear(self):
+        self.first = self.last = -1  # oldest keyframe tick and newest recorded tick
+
+    def __len__(self):
+        # Ticks you can go back from the newest recorded one.
+        return 0 if self.last < 0 else self.last - self.first
+
+    def record(self, world, flapped=False):
+        """Store ``world`` just after a tick; ``flapped`` says whether it flapped before it."""
+        tick = world.ticks
+        if self.last < 0 or tick != self.last + 1:
+            if tick % self.keyframe_every:
+                raise ValueError("recording must start on a keyframe tick")
+            self.first = tick
+        self.inputs[tick % self.ticks] = flapped
+        if tick % self.keyframe_every == 0:
+            self.save_keyframe(world)
+            # The oldest keyframe slot was just overwritten.
+            self.first = max(self.first, tick - (self.keyframes - 1) * self.keyframe_every)
+        self.last = tick
+
+    def save_keyframe(self, world):
+        slot = world.ticks // self.keyframe_every % self.keyframes
+        pipes = world.pipes
+        KEYFRAME.pack_into(self.frames, slot * KEYFRAME.size, world.bird_y, world.velocity, world.prev_y,
+                           world.prev_scroll, world.spawn_timer, world.score, world.ticks, world.over,
+                           pipes.head, pipes.tail, pipes.scored, pipes.near, pipes.scroll,
+                           *pipes.x, *pipes.top, *pipes.bottom)
+        _, state, gauss_next = world.rng.getstate()
+        RNG_STATE.pack_into(self.rng_states, slot * RNG_STATE.size, *state,
+                            math.nan if gauss_next is None else gauss_next)
+
+    def load_keyframe(self, world, tick):
+        slot = tick // self.keyframe_every % self.keyframes
+        values = KEYFRAME.unpack_from(self.frames, slot * KEYFRAME.size)
+        (world.bird_y, world.velocity, world.prev_y, world.prev_scroll, world.spawn_timer, world.score,
+         world.ticks, over, *counters) = values[:13]
+        world.over = bool(over)
+        pipes = world.pipes
+        pipes.head, pipes.tail, pipes.scored, pipes.near, pipes.scroll = counters
+        capacity = len(pipes.x)
+        pipes.x[:] = values[13:13 + capacity]
+        pipes.top[:] = values[13 + capacity:13 + 2 * capacity]
+        pipes.bottom[:] = values[13 + 2 * capacity:]
+        *state, gauss_next = RNG_STATE.unpack_from(self.rng_states, slot * RNG_STATE.size)
+        world.rng.setstate((RNG_VERSION, tuple(state), None if math.isnan(gauss_next) else gauss_next))
+
+    def rewind(self, world, ticks):
+        """Put ``world`` back ``ticks`` ticks (as far as the buffer goes); returns the tick it is now at.
+
+        Everything recorded after that tick is dropped, so play continues from there.
+        """
+        if self.last < 0:
+            return world.ticks
+        target = max(self.first, self.last - ticks)
+        keyframe = target - target % self.keyframe_every
+        self.load_keyframe(world, keyframe)
+        for tick in range(keyframe + 1, target + 1):
+            if self.inputs[tick % self.ticks]:
+                world.flap()
+            world.step()
+        world.prev_y, world.prev_scroll = world.bird_y, world.pipes.scroll  # no interpolation across the jump
+        self.last = target
+        return target
@@ -0,0 +1,199 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from physics import (
+    BIRD_RADIUS, BIRD_X, DIFFICULTIES, FLAP_STRENGTH, HEIGHT, PIPE_SPEED, PIPE_WIDTH, SPAWN_INTERVAL, WIDTH,
+    PipeRing, new_pipe_top,
+)
+
+# Columns of ``observe()``.
+OBS_Y, OBS_VELOCITY, OBS_PIPE_DX, OBS_GAP_TOP, OBS_GAP_BOTTOM = range(5)
+
+
+# --- Collision ---
+# physics.sweep_hits_rect for arrays of segments, against both rects of a pipe.
+
+def _segments_hit_box(x, y, dx, dy, left, right, low, high):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xa, xb = np.divide(left - x, dx), np.divide(right - x, dx)
+        ya, yb = np.divide(low - y, dy), np.divide(high - y, dy)
+    enter = np.maximum(np.maximum(np.minimum(xa, xb), np.minimum(ya, yb)), 0.0)
+    leave = np.minimum(np.minimum(np.maximum(xa, xb), np.maximum(ya, yb)), 1.0)
+    return enter < leave  # NaN (grazing an edge head-on) counts as a miss, as in physics
+
+
+def _segments_hit_disc(x, y, dx, dy, cx, cy, radius):
+    mx, my = x - cx, y - cy
+    length2 = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(length2 > 0, np.clip(-(mx * dx + my * dy) / length2, 0.0, 1.0), 0.0)
+    ex, ey = mx + t * dx, my + t * dy
+    return ex * ex + ey * ey < radius * radius
+
+
+def sweep_hits_pipe(x0, y0, x1, y1, radius, left, right, top, bottom):
+    dx, dy = x1 - x0, y1 - y0
+    hit = np.zeros(np.broadcast(x0, y0, x1, y1).shape, dtype=bool)
+    for low, high, corner in ((-np.inf, top, top), (bottom, np.inf, bottom)):
+        hit |= _segments_hit_box(x0, y0, dx, dy, left - radius, right + radius, low, high)
+        hit |= _segments_hit_box(x0, y0, dx, dy, left, right, low - radius, high + radius)
+        for cx in (left, right):
+            hit |= _segments_hit_disc(x0, y0, dx, dy, cx, corner, radius)
+    return hit
+
+
+class BatchFlappy:
+    """A population of birds flown together through one seeded pipe stream.
+
+    Rules match ``main.py`` frame for frame: gravity, then pipes spawn and move,
+    then scoring, then collision. All birds sit at ``BIRD_X`` and see the same
+    pipes, so the pipes live in one ``PipeRing`` and only the bird state is
+    per-bird arrays. A one-bird population seeded like a ``World``'s ``rng``
+    replays a real game exactly. Dead birds stay where they fell.
+    """
+
+    def __init__(self, num_birds, difficulty="Medium", seed=None):
+        self.num_birds = num_birds
+        self.pipe_gap, self.gravity = DIFFICULTIES[difficulty]
+        self.y = np.zeros(num_birds)
+        self.velocity = np.zeros(num_birds)
+        self.alive = np.zeros(num_birds, dtype=bool)
+        self.score = np.zeros(num_birds, dtype=np.int32)
+        self.frames = np.zeros(num_birds, dtype=np.int64)
+        self.rng = random.Random(seed)
+        self.pipes = PipeRing()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        self.y[:] = HEIGHT // 2
+        self.velocity[:] = 0.0
+        self.alive[:] = True
+        self.score[:] = 0
+        self.frames[:] = 0
+        self.frame = 0
+        self.spawn_timer = 0
+        self.pipes.clear()
+        return self
+
+    def step(self, flaps=None, ticks=1):
+        """Advance ``ticks`` frames. ``flaps`` is a bool array (flap before the first one).
+
+        Returns ``(reward, done)``: reward is 1 for passing a pipe, -1 on death.
+        With ``ticks`` > 1 birds coast between decisions: their positions come
+        from the closed form for a flap-free stretch and collision is swept
+        along two chords split at the top of the arc. The radius is padded by
+        how far the real arc strays from the chords (gravity * ticks**2 / 8),
+        so a coarse step can only see a hit early, never miss one.
+        """
+        alive = self.alive
+        reward = np.zeros(self.num_birds, dtype=np.int8)
+        if not alive.any():
+            return reward, ~alive
+
+        velocity, gravity = self.velocity, self.gravity
+        if flaps is not None:
+            velocity[np.asarray(flaps, dtype=bool) & alive] = FLAP_STRENGTH
+        y0 = self.y.copy()
+        if ticks == 1:
+            velocity[alive] += gravity
+            self.y[alive] += velocity[alive]
+            apex = self.y
+        else:
+            # Ticks until the highest point of the arc (0 when already falling).
+            top_tick = np.clip(np.rint(-velocity / gravity - 0.5), 0, ticks)
+            apex = np.where(alive, y0 + top_tick * velocity + gravity * top_tick * (top_tick + 1) / 2, y0)
+            self.y[alive] += ticks * velocity[alive] + gravity * ticks * (ticks + 1) / 2
+            velocity[alive] += ticks * gravity
+        self.frames[alive] += ticks
+        self.frame += ticks
+
+        passed = 0
+        for _ in range(ticks):
+            self.spawn_timer += 1
+            if self.spawn_timer > SPAWN_INTERVAL:
+                top = new_pipe_top(self.rng, self.pipe_gap)
+                self.pipes.spawn(top, top + self.pipe_gap)
+                self.spawn_timer = 0
+            self.pipes.advance(PIPE_SPEED)
+            passed += self.pipes.score()
+        if passed:
+            self.score[alive] += passed
+            reward[alive] = 1
+
+        y = self.y
+        hit = (np.maximum(y0, y) + BIRD_RADIUS >= HEIGHT) | (np.minimum(apex, y) - BIRD_RADIUS <= 0)
+        dx = ticks * PIPE_SPEED
+        if ticks == 1:
+            legs = ((BIRD_X - dx, y0, BIRD_X, y),)
+            radius = BIRD_RADIUS
+        else:
+            x_apex = BIRD_X - (ticks - top_tick) * PIPE_SPEED
+            legs = ((BIRD_X - dx, y0, x_apex, apex), (x_apex, apex, BIRD_X, y))
+            radius = BIRD_RADIUS + gravity * ticks * ticks / 8
+        pipes = self.pipes
+        for i in pipes.column(dx, radius):
+            slot = i & pipes.mask
+            left, top, bottom = pipes.x_at(slot), pipes.top[slot], pipes.bottom[slot]
+            # Only birds whose sweep reaches above the gap or below it can touch this pipe.
+            near = np.flatnonzero(alive & ((np.minimum(apex, y) - radius < top) | (np.maximum(y0, y) + radius > bottom)))
+            if len(near):
+                for leg in legs:
+                    leg = [part[near] if np.ndim(part) else part for part in leg]
+                    hit[near] |= sweep_hits_pipe(*leg, radius, left, left + PIPE_WIDTH, top, bottom)
+        dead = hit & alive
+        alive &= ~dead
+        reward[dead] = -1
+        return reward, ~alive
+
+    def observe(self):
+        """Per-bird features: y, velocity, distance to the next pipe and its gap edges."""
+        obs = np.empty((self.num_birds, 5))
+        obs[:, OBS_Y] = self.y
+        obs[:, OBS_VELOCITY] = self.velocity
+        pipes = self.pipes
+        slot = pipes.next_pipe()
+        if slot < 0:
+            obs[:, OBS_PIPE_DX] = WIDTH - BIRD_X
+            obs[:, OBS_GAP_TOP] = (HEIGHT - self.pipe_gap) / 2
+            obs[:, OBS_GAP_BOTTOM] = (HEIGHT + self.pipe_gap) / 2
+        else:
+            obs[:, OBS_PIPE_DX] = pipes.x_at(slot) - BIRD_X
+            obs[:, OBS_GAP_TOP] = pipes.top[slot]
+            obs[:, OBS_GAP_BOTTOM] = pipes.bottom[slot]
+        return obs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the headless Flappy Bird population simulator")
+    parser.add_argument("--birds", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), default="Medium")
+    parser.add_argument("--stride", type=int, default=1, help="frames per decision (and per collision sweep)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # A noisy "flap when below the gap" policy keeps most of the population alive.
+    sim = BatchFlappy(args.birds, args.difficulty, args.seed)
+    noise = np.random.default_rng(args.seed).normal(0, 25, args.birds)
+    bird_steps = 0
+    start = time.perf_counter()
+    for _ in range(0, args.frames, args.stride):
+        obs = sim.observe()
+        target = obs[:, OBS_GAP_BOTTOM] - BIRD_RADIUS - 25 + noise
+        bird_steps += args.stride * int(sim.alive.sum())
+        _, done = sim.step((obs[:, OBS_Y] > target) & (obs[:, OBS_VELOCITY] > 0), args.stride)
+        if done.all():
+            break
+    elapsed = time.perf_counter() - start
+    print(f"{args.birds} birds, {sim.frame} frames in {elapsed:.2f}s: {bird_steps / elapsed:,.0f} live bird-steps/s "
+          f"({sim.frame / elapsed / 60:,.0f}x real time), {int(sim.alive.sum())} alive, "
+          f"best score {int(sim.score.max())}, mean {sim.score.mean():.1f}")
+
+
+if __name__ == "__main__":
+    main()
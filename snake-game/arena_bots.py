@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from array import array
+
+from arena_server import (
+    COUNT, FRAME, MSG_WELCOME, RESPAWN, SPAWN, TICK, WELCOME, ArenaView,
+)
+from engine import DELTAS
+
+
+class BotProtocol(asyncio.Protocol):
+    # Loopback load-test client. It decodes just enough of each tick (spawned
+    # bodies, heads, deaths) to steer its own snake away from walls, respawns
+    # when it dies, and records frame arrival times. One bot in a run can keep a
+    # full ArenaView mirror to check the deltas add up.
+    def __init__(self, stats, rng, view=None):
+        self.stats = stats
+        self.rng = rng
+        self.view = view
+        self.buffer = bytearray()
+        self.transport = None
+        self.snake_id = 0
+        self.cols = self.rows = 0
+        self.head = -1
+        self.direction = 1
+        self.last_frame = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        pos = 0
+        while len(buffer) - pos >= FRAME.size:
+            (size,) = FRAME.unpack_from(buffer, pos)
+            if len(buffer) - pos - FRAME.size < size:
+                break
+            start = pos + FRAME.size
+            self.handle(bytes(buffer[start:start + size]))
+            pos = start + size
+        del buffer[:pos]
+
+    def find_own(self, data, pos):
+        # Scan a spawned list for our snake; return the position after it.
+        (n,) = COUNT.unpack_from(data, pos)
+        pos += 2
+        for _ in range(n):
+            snake_id, length = SPAWN.unpack_from(data, pos)
+            pos += 4
+            if snake_id == self.snake_id:
+                self.head = array("I", data[pos + 4 * (length - 1):pos + 4 * length])[0]
+                self.direction = 1
+            pos += 4 * length
+        return pos
+
+    def handle(self, data):
+        now = time.perf_counter()
+        stats = self.stats
+        stats["frames"] += 1
+        stats["bytes"] += len(data) + FRAME.size
+        if self.view is not None:
+            self.view.apply(data)
+
+        if data[0] == MSG_WELCOME:
+            _, self.snake_id, self.cols, self.rows = WELCOME.unpack_from(data)
+            self.find_own(data, WELCOME.size)
+            return
+
+        if self.last_frame is not None:
+            stats["gaps"].append(now - self.last_frame)
+        self.last_frame = now
+
+        pos = self.find_own(data, TICK.size)
+        (n,) = COUNT.unpack_from(data, pos)
+        pos += 2 + 2 * n  # tails
+        (n,) = COUNT.unpack_from(data, pos)
+        ids = array("H", data[pos + 2:pos + 2 + 2 * n])
+        cells = pos + 2 + 2 * n
+        pos = cells + 4 * n
+        try:
+            i = ids.index(self.snake_id)
+            self.head = array("I", data[cells + 4 * i:cells + 4 * i + 4])[0]
+        except ValueError:
+            pass
+        (n,) = COUNT.unpack_from(data, pos)
+        if self.snake_id in array("H", data[pos + 2:pos + 2 + 2 * n]):
+            stats["deaths"] += 1
+            self.head = -1
+            self.transport.write(bytes([RESPAWN]))
+            return
+        if self.head >= 0:
+            self.steer()
+
+    def steer(self):
+        x, y = self.head % self.cols, self.head // self.cols
+        dx, dy = DELTAS[self.direction]
+        blocked = not (1 <= x + dx < self.cols - 1 and 1 <= y + dy < self.rows - 1)
+        if blocked or self.rng.random() < 0.05:
+            choices = [d for d in ((self.direction + 1) % 4, (self.direction + 3) % 4)
+                       if 1 <= x + DELTAS[d][0] < self.cols - 1 and 1 <= y + DELTAS[d][1] < self.rows - 1]
+            if choices:
+                self.direction = self.rng.choice(choices)
+                self.stats["inputs"] += 1
+                self.transport.write(bytes([self.direction]))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def run_bots(host, port, count, duration, seed):
+    loop = asyncio.get_running_loop()
+    stats = {"frames": 0, "bytes": 0, "deaths": 0, "inputs": 0, "gaps": []}
+    rng = random.Random(seed)
+    mirror = ArenaView()
+    bots = []
+    for i in range(count):
+        view = mirror if i == 0 else None
+        _, bot = await loop.create_connection(
+            lambda: BotProtocol(stats, random.Random(rng.random()), view), host, port)
+        bots.append(bot)
+
+    await asyncio.sleep(1.0)  # let everyone receive a welcome
+    for key in ("frames", "bytes", "deaths", "inputs"):
+        stats[key] = 0
+    stats["gaps"].clear()
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - start
+
+    gaps = stats["gaps"]
+    cells = [cell for body in mirror.bodies.values() for cell in body]
+    overlaps = len(cells) - len(set(cells))
+    print(f"{count} bots for {elapsed:.1f}s: {stats['frames'] / elapsed / count:.1f} frames/s per bot, "
+          f"{stats['bytes'] / max(stats['frames'], 1):.0f} B/frame, {stats['inputs'] / elapsed:.0f} inputs/s, "
+          f"{stats['deaths']} deaths")
+    print(f"tick interval mean {1000 * sum(gaps) / max(len(gaps), 1):.1f} ms, "
+          f"p99 {1000 * percentile(gaps, 0.99):.1f} ms, max {1000 * max(gaps, default=0):.1f} ms")
+    print(f"mirror at tick {mirror.tick}: {len(mirror.bodies)} snakes, {len(mirror.food)} food, "
+          f"{overlaps} overlapping cells")
+    for bot in bots:
+        bot.transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback bot clients for the Snake arena server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bots", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-server", action="store_true", help="start arena_server.py as a subprocess")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "arena_server.py")
+        server = subprocess.Popen([sys.executable, script, "--host", args.host, "--port", str(args.port)])
+        time.sleep(1.0)
+    try:
+        asyncio.run(run_bots(args.host, args.port, args.bots, args.duration, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+import argparse
+import asyncio
+import random
+import struct
+import time
+from array import array
+from collections import deque
+
+from engine import DELTAS, START_LENGTH, is_turn
+
+# --- Arena ---
+ARENA_COLS, ARENA_ROWS = 200, 200
+TICK_RATE = 25
+FOOD_PER_SNAKE = 2
+MIN_FOOD = 50
+MAX_WRITE_BUFFER = 1 << 20  # drop clients that fall this far behind
+
+# --- Protocol ---
+# Every server message is a frame: u32 payload length, then the payload.
+# Welcome: type, your snake id, cols, rows, then a snapshot in the tick layout
+#   (spawned = every live snake, food added = every food cell).
+# Tick: type, tick number, then in the order a client applies them:
+#   spawned   u16 n, n x (u16 id, u16 len, len x u32 cell)  tail first
+#   tails     u16 n, n x u16 id                             one tail cell dropped
+#   heads     u16 n, n x u16 id, n x u32 cell               new head cells
+#   dead      u16 n, n x u16 id                             whole body removed
+#   food gone u16 n, n x u32 cell
+#   food new  u16 n, n x u32 cell
+# Clients send single bytes: 0-3 to steer (engine action codes), RESPAWN to rejoin.
+MSG_WELCOME, MSG_TICK = 1, 2
+RESPAWN = 0x80
+FRAME = struct.Struct("<I")
+WELCOME = struct.Struct("<BHHH")
+TICK = struct.Struct("<BI")
+COUNT = struct.Struct("<H")
+SPAWN = struct.Struct("<HH")
+
+
+def pack_ids(ids):
+    return COUNT.pack(len(ids)) + array("H", ids).tobytes()
+
+
+def pack_cells(cells):
+    return COUNT.pack(len(cells)) + array("I", cells).tobytes()
+
+
+def pack_spawned(snakes):
+    parts = [COUNT.pack(len(snakes))]
+    for snake_id, cells in snakes:
+        parts.append(SPAWN.pack(snake_id, len(cells)))
+        parts.append(array("I", cells).tobytes())
+    return b"".join(parts)
+
+
+class ArenaSnake:
+    __slots__ = ("id", "body", "direction", "pending", "length", "alive")
+
+    def __init__(self, snake_id):
+        self.id = snake_id
+        self.body = deque()
+        self.direction = 1
+        self.pending = None
+        self.length = START_LENGTH
+        self.alive = False
+
+
+class Arena:
+    """Authoritative multi-snake board. ``owner`` is the spatial grid: one entry per
+    cell holding the id of the snake covering it (0 = empty), so every collision,
+    including snake-vs-snake, is a single lookup. Each ``step`` records its changes
+    as deltas that ``encode_tick`` packs for broadcast.
+    """
+
+    def __init__(self, cols=ARENA_COLS, rows=ARENA_ROWS, seed=None):
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.rng = random.Random(seed)
+        self.owner = array("H", bytes(2 * self.cells))
+        self.food_grid = bytearray(self.cells)
+        self.food = set()
+        self.snakes = {}
+        self.free_ids = deque(range(1, 0x10000))
+        self.spawn_queue = deque()
+        self.leave_queue = deque()
+        self.tick = 0
+        self.clear_deltas()
+
+    def clear_deltas(self):
+        self.spawned = []
+        self.tails = []
+        self.head_ids = []
+        self.head_cells = []
+        self.dead = []
+        self.food_removed = []
+        self.food_added = []
+
+    # --- Players ---
+
+    def join(self):
+        snake = ArenaSnake(self.free_ids.popleft())
+        self.snakes[snake.id] = snake
+        self.spawn_queue.append(snake.id)
+        return snake.id
+
+    def leave(self, snake_id):
+        self.leave_queue.append(snake_id)
+
+    def respawn(self, snake_id):
+        snake = self.snakes.get(snake_id)
+        if snake is not None and not snake.alive and snake_id not in self.spawn_queue:
+            self.spawn_queue.append(snake_id)
+
+    def steer(self, snake_id, action):
+        snake = self.snakes.get(snake_id)
+        if snake is not None:
+            snake.pending = action
+
+    # --- Simulation ---
+
+    def _spawn(self, snake):
+        owner, cols = self.owner, self.cols
+        for _ in range(100):
+            x = self.rng.randrange(START_LENGTH + 2, cols - 3)
+            y = self.rng.randrange(2, self.rows - 2)
+            cells = [y * cols + x - i for i in range(START_LENGTH - 1, -1, -1)]
+            # Also keep the two cells ahead clear so nobody spawns into a wall of bodies.
+            if not any(owner[c] for c in cells + [cells[-1] + 1, cells[-1] + 2]):
+                break
+        else:
+            return False
+        snake.body = deque(cells)
+        snake.direction = 1
+        snake.pending = None
+        snake.length = START_LENGTH
+        snake.alive = True
+        for cell in cells:
+            owner[cell] = snake.id
+            if self.food_grid[cell]:
+                self._remove_food(cell)
+        self.spawned.append((snake.id, cells))
+        return True
+
+    def _kill(self, snake):
+        owner = self.owner
+        for cell in snake.body:
+            if owner[cell] == snake.id:
+                owner[cell] = 0
+        snake.body.clear()
+        snake.alive = False
+        self.dead.append(snake.id)
+
+    def _remove_food(self, cell):
+        self.food_grid[cell] = 0
+        self.food.discard(cell)
+        self.food_removed.append(cell)
+
+    def _add_food(self):
+        target = max(MIN_FOOD, FOOD_PER_SNAKE * len(self.snakes))
+        owner, food_grid = self.owner, self.food_grid
+        tries = 0
+        while len(self.food) < target and tries < 4 * target:
+            tries += 1
+            cell = self.rng.randrange(self.cells)
+            if not owner[cell] and not food_grid[cell]:
+                food_grid[cell] = 1
+                self.food.add(cell)
+                self.food_added.append(cell)
+
+    def step(self):
+        self.clear_deltas()
+        self.tick += 1
+        owner, cols, rows = self.owner, self.cols, self.rows
+
+        while self.leave_queue:
+            snake = self.snakes.pop(self.leave_queue.popleft(), None)
+            if snake is not None:
+                if snake.alive:
+                    self._kill(snake)
+                self.free_ids.append(snake.id)
+        just_spawned = set()
+        while self.spawn_queue:
+            snake = self.snakes.get(self.spawn_queue.popleft())
+            if snake is not None and not snake.alive and self._spawn(snake):
+                just_spawned.add(snake.id)
+
+        moves = []
+        doomed = []
+        for snake in self.snakes.values():
+            if not snake.alive or snake.id in just_spawned:
+                continue
+            if snake.pending is not None and is_turn(snake.direction, snake.pending):
+                snake.direction = snake.pending
+            snake.pending = None
+            head = snake.body[-1]
+            dx, dy = DELTAS[snake.direction]
+            x, y = head % cols + dx, head // cols + dy
+            if 0 <= x < cols and 0 <= y < rows:
+                moves.append((snake, y * cols + x))
+            else:
+                doomed.append(snake)
+
+        # Tails move first, so following another snake's tail is legal.
+        for snake, _ in moves:
+            if len(snake.body) >= snake.length:
+                owner[snake.body.popleft()] = 0
+                self.tails.append(snake.id)
+
+        claims = {}
+        for snake, cell in moves:
+            if owner[cell]:
+                doomed.append(snake)
+            elif cell in claims:
+                doomed.append(snake)
+                doomed.append(claims[cell])  # head-on: both die
+            else:
+                claims[cell] = snake
+        doomed_ids = {snake.id for snake in doomed}
+
+        for cell, snake in claims.items():
+            if snake.id in doomed_ids:
+                continue
+            snake.body.append(cell)
+            owner[cell] = snake.id
+            self.head_ids.append(snake.id)
+            self.head_cells.append(cell)
+            if self.food_grid[cell]:
+                snake.length += 1
+                self._remove_food(cell)
+
+        for snake in doomed:
+            if snake.alive:
+                self._kill(snake)
+        self._add_food()
+
+    # --- Encoding ---
+
+    def encode_tick(self):
+        payload = b"".join((
+            TICK.pack(MSG_TICK, self.tick),
+            pack_spawned(self.spawned),
+            pack_ids(self.tails),
+            pack_ids(self.head_ids),
+            array("I", self.head_cells).tobytes(),
+            pack_ids(self.dead),
+            pack_cells(self.food_removed),
+            pack_cells(self.food_added),
+        ))
+        return FRAME.pack(len(payload)) + payload
+
+    def encode_welcome(self, snake_id):
+        snapshot = [(s.id, list(s.body)) for s in self.snakes.values() if s.alive]
+        payload = b"".join((
+            WELCOME.pack(MSG_WELCOME, snake_id, self.cols, self.rows),
+            pack_spawned(snapshot),
+            pack_cells(list(self.food)),
+        ))
+        return FRAME.pack(len(payload)) + payload
+
+
+class ArenaView:
+    # Client-side mirror of the arena, rebuilt from the welcome frame and kept in
+    # step by applying tick deltas.
+    def __init__(self):
+        self.snake_id = 0
+        self.cols = self.rows = 0
+        self.tick = 0
+        self.bodies = {}
+        self.food = set()
+
+    def _read_spawned(self, data, pos):
+        (n,) = COUNT.unpack_from(data, pos)
+        pos += 2
+        for _ in range(n):
+            snake_id, length = SPAWN.unpack_from(data, pos)
+            pos += 4
+            self.bodies[snake_id] = deque(array("I", data[pos:pos + 4 * length]))
+            pos += 4 * length
+        return pos
+
+    def _read(self, data, pos, code, size):
+        (n,) = COUNT.unpack_from(data, pos)
+        pos += 2
+        return array(code, data[pos:pos + size * n]), pos + size * n
+
+    def apply(self, data):
+        if data[0] == MSG_WELCOME:
+            _, self.snake_id, self.cols, self.rows = WELCOME.unpack_from(data)
+            self.bodies.clear()
+            pos = self._read_spawned(data, WELCOME.size)
+            food, pos = self._read(data, pos, "I", 4)
+            self.food = set(food)
+            return
+        _, self.tick = TICK.unpack_from(data)
+        pos = self._read_spawned(data, TICK.size)
+        tails, pos = self._read(data, pos, "H", 2)
+        for snake_id in tails:
+            self.bodies[snake_id].popleft()
+        head_ids, pos = self._read(data, pos, "H", 2)
+        head_cells = array("I", data[pos:pos + 4 * len(head_ids)])
+        pos += 4 * len(head_ids)
+        for snake_id, cell in zip(head_ids, head_cells):
+            self.bodies[snake_id].append(cell)
+        dead, pos = self._read(data, pos, "H", 2)
+        for snake_id in dead:
+            self.bodies.pop(snake_id, None)
+        removed, pos = self._read(data, pos, "I", 4)
+        self.food.difference_update(removed)
+        added, pos = self._read(data, pos, "I", 4)
+        self.food.update(added)
+
+
+class ArenaProtocol(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.snake_id = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.snake_id = self.server.arena.join()
+        self.server.joining.append(self)
+
+    def data_received(self, data):
+        arena = self.server.arena
+        for byte in data:
+            if byte == RESPAWN:
+                arena.respawn(self.snake_id)
+            elif byte < 4:
+                arena.steer(self.snake_id, byte)
+
+    def connection_lost(self, exc):
+        self.server.clients.discard(self)
+        self.server.arena.leave(self.snake_id)
+
+
+class ArenaServer:
+    def __init__(self, arena, tick_rate=TICK_RATE, stats_every=5.0):
+        self.arena = arena
+        self.tick_rate = tick_rate
+        self.stats_every = stats_every
+        self.clients = set()
+        self.joining = []
+        self.tick_times = []
+        self.frame_bytes = 0
+
+    def broadcast(self):
+        frame = self.arena.encode_tick()
+        self.frame_bytes += len(frame)
+        for client in list(self.clients):
+            transport = client.transport
+            if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                transport.close()
+                continue
+            transport.write(frame)
+        for client in self.joining:
+            if not client.transport.is_closing():
+                client.transport.write(self.arena.encode_welcome(client.snake_id))
+                self.clients.add(client)
+        self.joining.clear()
+
+    def report(self):
+        times = sorted(self.tick_times)
+        if not times:
+            return
+        alive = sum(1 for snake in self.arena.snakes.values() if snake.alive)
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        print(f"tick {self.arena.tick}: {len(self.clients)} clients, {alive} alive, "
+              f"tick mean {1000 * sum(times) / len(times):.2f} ms, p99 {1000 * p99:.2f} ms, "
+              f"max {1000 * times[-1]:.2f} ms, {self.frame_bytes / len(times):.0f} B/frame", flush=True)
+        self.tick_times.clear()
+        self.frame_bytes = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.tick_rate
+        deadline = loop.time()
+        next_report = deadline + self.stats_every
+        while True:
+            started = time.perf_counter()
+            self.arena.step()
+            self.broadcast()
+            self.tick_times.append(time.perf_counter() - started)
+
+            deadline += interval
+            now = loop.time()
+            if now >= next_report:
+                self.report()
+                next_report = now + self.stats_every
+            if deadline < now:
+                deadline = now  # running behind: don't try to catch up in a burst
+            await asyncio.sleep(deadline - now)
+
+
+async def serve(host, port, cols, rows, tick_rate, seed=None):
+    server = ArenaServer(Arena(cols, rows, seed), tick_rate)
+    loop = asyncio.get_running_loop()
+    listener = await loop.create_server(lambda: ArenaProtocol(server), host, port)
+    print(f"arena {cols}x{rows} at {tick_rate} ticks/s on {host}:{port}", flush=True)
+    async with listener:
+        await server.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authoritative multi-player Snake arena server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cols", type=int, default=ARENA_COLS)
+    parser.add_argument("--rows", type=int, default=ARENA_ROWS)
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.cols, args.rows, args.tick_rate, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
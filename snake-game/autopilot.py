@@ -0,0 +1,198 @@
+import heapq
+from collections import deque
+
+from engine import DELTAS, NOOP
+
+
+def hamiltonian_cycle(cols, rows):
+    # Serpentine cycle: along the first row, zig-zag through columns 1.. and back up
+    # column 0. Needs an even number of rows (or columns, by transposing).
+    if cols < 2 or rows < 2 or (cols % 2 and rows % 2):
+        raise ValueError("a Hamiltonian cycle needs a board with an even side")
+    if rows % 2:
+        return [x * cols + y for y, x in (divmod(c, rows) for c in hamiltonian_cycle(rows, cols))]
+    cycle = [x for x in range(cols)]
+    for y in range(1, rows):
+        xs = range(cols - 1, 0, -1) if y % 2 else range(1, cols)
+        cycle.extend(y * cols + x for x in xs)
+    cycle.extend(y * cols for y in range(rows - 1, 0, -1))
+    return cycle
+
+
+class Autopilot:
+    """Snake bot: shortest path to the food, restricted to moves that keep the body
+    ordered along a Hamiltonian cycle so it can never trap itself.
+
+    Shortcuts off the cycle are only taken while the snake covers less than
+    ``shortcut_limit`` of the board; after that it follows the cycle, which the
+    tail clears behind it, so long snakes on full boards keep surviving.
+
+    The food distance field is kept up to date incrementally from the cells that
+    change each tick (new head, vacated tail); it is rebuilt only when food moves.
+    """
+
+    def __init__(self, cols, rows, shortcut_limit=0.5):
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.inf = self.cells + 1
+        self.max_shortcut_length = int(self.cells * shortcut_limit)
+        self.cycle = hamiltonian_cycle(cols, rows)
+        self.order = [0] * self.cells
+        for i, cell in enumerate(self.cycle):
+            self.order[cell] = i
+
+        # (action, cell) for every in-bounds neighbour of each cell.
+        self.moves = []
+        for cell in range(self.cells):
+            x, y = cell % cols, cell // cols
+            moves = []
+            for action, (dx, dy) in enumerate(DELTAS):
+                if 0 <= x + dx < cols and 0 <= y + dy < rows:
+                    moves.append((action, (y + dy) * cols + x + dx))
+            self.moves.append(tuple(moves))
+        self.neighbours = [tuple(cell for _, cell in moves) for moves in self.moves]
+
+        self.dist = [self.inf] * self.cells
+        self.ticks = -1
+        self.food = -1
+        self.full_updates = 0
+        self.incremental_updates = 0
+
+    # --- Distance field ---
+
+    def rebuild(self, env):
+        inf, occupied, neighbours = self.inf, env.occupied, self.neighbours
+        dist = self.dist = [inf] * self.cells
+        self.food = env.food
+        self.full_updates += 1
+        if env.food < 0:
+            return
+        dist[env.food] = 0
+        queue = deque([env.food])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1
+            for v in neighbours[u]:
+                if dist[v] > d and not occupied[v]:
+                    dist[v] = d
+                    queue.append(v)
+
+    def block(self, env, cell):
+        # A cell became occupied: invalidate every cell whose shortest paths all
+        # ran through it, then re-seed those from their surviving neighbours.
+        dist, neighbours, inf = self.dist, self.neighbours, self.inf
+        d = dist[cell]
+        if d >= inf:
+            return
+        dist[cell] = inf
+        level, affected = [cell], []
+        while level:
+            upper = []
+            for u in level:
+                for v in neighbours[u]:
+                    if dist[v] == d + 1:
+                        for w in neighbours[v]:
+                            if dist[w] == d:
+                                break
+                        else:
+                            dist[v] = inf
+                            upper.append(v)
+            affected.extend(upper)
+            level = upper
+            d += 1
+
+        occupied = env.occupied
+        heap = []
+        for a in affected:
+            best = min(dist[w] for w in neighbours[a]) + 1
+            if best < inf:
+                dist[a] = best
+                heap.append((best, a))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d != dist[u]:
+                continue
+            d += 1
+            for v in neighbours[u]:
+                if dist[v] > d and not occupied[v]:
+                    dist[v] = d
+                    heapq.heappush(heap, (d, v))
+
+    def release(self, env, cell):
+        # A cell became free: it can only shorten paths, so relax outwards from it.
+        dist, neighbours, occupied = self.dist, self.neighbours, env.occupied
+        if occupied[cell]:
+            return  # the head moved straight into the vacated tail cell
+        best = min(dist[w] for w in neighbours[cell]) + 1
+        if best >= dist[cell]:
+            return
+        dist[cell] = best
+        queue = deque([cell])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1
+            for v in neighbours[u]:
+                if dist[v] > d and not occupied[v]:
+                    dist[v] = d
+                    queue.append(v)
+
+    def sync(self, env):
+        if env.ticks != self.ticks + 1 or env.food != self.food:
+            if env.ticks == 0:
+                self.orient(env)
+            self.rebuild(env)
+        else:
+            self.incremental_updates += 1
+            self.block(env, env.head)
+            if env.vacated >= 0:
+                self.release(env, env.vacated)
+        self.ticks = env.ticks
+
+    def orient(self, env):
+        # Run the cycle in the direction the starting body already follows.
+        order, n = self.order, self.cells
+        segments = list(env.segments())
+        if segments and any((order[b] - order[a]) % n != 1 for a, b in zip(segments, segments[1:])):
+            self.cycle.reverse()
+            for i, cell in enumerate(self.cycle):
+                order[cell] = i
+
+    # --- Decisions ---
+
+    def act(self, env):
+        """Return the action for the next tick; call once per tick after ``env.step``."""
+        self.sync(env)
+        if env.done or env.food < 0:
+            return NOOP
+
+        order, n, dist, occupied = self.order, self.cells, self.dist, env.occupied
+        head = env.head
+        base = order[head]
+        to_tail = (order[env.tail] - base) % n or n
+        to_food = (order[env.food] - base) % n
+        growth = env.length - env.count
+
+        best_action, best_key = NOOP, None
+        moves = self.moves[head] if env.length < self.max_shortcut_length else ()
+        for action, cell in moves:
+            if occupied[cell]:
+                continue
+            ahead = (order[cell] - base) % n
+            # Never jump past the food or close the gap to the tail on the cycle.
+            if ahead == 0 or ahead > to_food:
+                continue
+            if to_tail - ahead <= growth + (cell == env.food):
+                continue
+            key = (dist[cell], -ahead)
+            if best_key is None or key < best_key:
+                best_action, best_key = action, key
+
+        if best_key is None:
+            # Follow the cycle; the next cell is free or is the tail moving away.
+            following = self.cycle[(base + 1) % n]
+            for action, cell in self.moves[head]:
+                if cell == following:
+                    return action
+        return best_action
@@ -0,0 +1,155 @@
+import numpy as np
+
+from engine import COLS, ROWS, START_LENGTH, NOOP
+
+# Indexed by action (UP, RIGHT, DOWN, LEFT, NOOP); NOOP keeps the current heading.
+DX = np.array([0, 1, 0, -1, 0], dtype=np.int32)
+DY = np.array([-1, 0, 1, 0, 0], dtype=np.int32)
+
+# Rejection tries before falling back to an exact scan of the free cells.
+FOOD_TRIES = 4
+
+
+class BatchSnakeEnv:
+    """Many independent Snake boards advanced together with array operations.
+
+    Rules match ``engine.SnakeEnv``, including the win once a snake fills its
+    board (``won``, no food left). Boards that die or win stay frozen until
+    ``reset_done``.
+    """
+
+    def __init__(self, num_envs, cols=COLS, rows=ROWS, seed=None):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.head_x = np.zeros(n, dtype=np.int32)
+        self.head_y = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.count = np.zeros(n, dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.body = np.zeros((n, self.cells), dtype=np.int32)  # ring buffer of cells per board
+        self.occupied = np.zeros((n, self.cells), dtype=np.uint8)
+        self.food = np.zeros(n, dtype=np.int32)
+        self.alive = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    @property
+    def score(self):
+        return self.length - START_LENGTH
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_rows(np.arange(self.num_envs))
+        return self
+
+    def reset_done(self):
+        rows = np.flatnonzero(~self.alive)
+        if rows.size:
+            self._reset_rows(rows)
+        return rows
+
+    def _reset_rows(self, rows):
+        cx, cy = self.cols // 2, self.rows // 2
+        self.occupied[rows] = 0
+        for i in range(START_LENGTH):
+            cell = cy * self.cols + cx - (START_LENGTH - 1 - i)
+            self.body[rows, i] = cell
+            self.occupied[rows, cell] = 1
+        self.head_x[rows] = cx
+        self.head_y[rows] = cy
+        self.direction[rows] = 1  # RIGHT
+        self.length[rows] = START_LENGTH
+        self.count[rows] = START_LENGTH
+        self.head_ptr[rows] = START_LENGTH - 1
+        self.ticks[rows] = 0
+        self.alive[rows] = True
+        self.won[rows] = False
+        self._place_food(rows)
+
+    def _place_food(self, rows):
+        cand = self.rng.integers(0, self.cells, size=rows.size, dtype=np.int32)
+        ok = self.occupied[rows, cand] == 0
+        for _ in range(FOOD_TRIES - 1):
+            if ok.all():
+                break
+            retry = ~ok
+            cand[retry] = self.rng.integers(0, self.cells, size=int(retry.sum()), dtype=np.int32)
+            ok = self.occupied[rows, cand] == 0
+        if not ok.all():
+            # Crowded boards: pick the k-th free cell directly.
+            slow = np.flatnonzero(~ok)
+            free = self.occupied[rows[slow]] == 0
+            n_free = free.sum(axis=1)
+            full = n_free == 0
+            k = (self.rng.random(slow.size) * np.maximum(n_free, 1)).astype(np.int64)
+            cand[slow] = np.argmax(np.cumsum(free, axis=1) > k[:, None], axis=1)
+            if full.any():
+                self.alive[rows[slow[full]]] = False
+        self.food[rows] = cand
+
+    def step(self, actions=None):
+        """Advance every live board one tick. Returns ``(reward, done)`` arrays."""
+        n = self.num_envs
+        reward = np.zeros(n, dtype=np.int8)
+        live = np.flatnonzero(self.alive)
+        if live.size == 0:
+            return reward, ~self.alive
+
+        d = self.direction[live]
+        if actions is not None:
+            a = np.asarray(actions)[live].astype(np.int8)
+            turn = (a < NOOP) & ((a - d) % 2 == 1)
+            d = np.where(turn, a, d)
+            self.direction[live] = d
+        hx = self.head_x[live] + DX[d]
+        hy = self.head_y[live] + DY[d]
+        self.head_x[live] = hx
+        self.head_y[live] = hy
+        self.ticks[live] += 1
+
+        inside = (hx >= 0) & (hx < self.cols) & (hy >= 0) & (hy < self.rows)
+        dead = live[~inside]
+        live = live[inside]
+        head = (hy * self.cols + hx)[inside]
+
+        # Drop the tail first so moving into the cell it vacates is legal.
+        full = self.count[live] >= self.length[live]
+        shrink = live[full]
+        tail_ptr = (self.head_ptr[shrink] - self.count[shrink] + 1) % self.cells
+        self.occupied[shrink, self.body[shrink, tail_ptr]] = 0
+        self.count[live[~full]] += 1
+
+        hit = self.occupied[live, head] != 0
+        dead = np.concatenate((dead, live[hit]))
+        live = live[~hit]
+        head = head[~hit]
+
+        ptr = (self.head_ptr[live] + 1) % self.cells
+        self.head_ptr[live] = ptr
+        self.body[live, ptr] = head
+        self.occupied[live, head] = 1
+
+        ate = live[head == self.food[live]]
+        if ate.size:
+            self.length[ate] += 1
+            reward[ate] = 1
+            filled = self.length[ate] == self.cells
+            if filled.any():
+                won = ate[filled]
+                self.won[won] = True
+                self.alive[won] = False
+                self.food[won] = -1
+                ate = ate[~filled]
+            self._place_food(ate)
+
+        self.alive[dead] = False
+        reward[dead] = -1
+        return reward, ~self.alive
@@ -0,0 +1,52 @@
+import argparse
+import time
+
+from engine import SnakeEnv
+from autopilot import Autopilot
+
+# Hard difficulty ticks at 25 FPS, so each decision has a 40 ms budget.
+HARD_TICK_MS = 1000 / 25
+
+
+def bench(cols, rows, fill, decisions, seed=0):
+    env = SnakeEnv(cols, rows).reset(seed)
+    pilot = Autopilot(cols, rows)
+    pilot.orient(env)
+    if fill:
+        # Lay the snake along the pilot's cycle so it starts near-full and safe.
+        length = max(3, int(cols * rows * fill))
+        start = pilot.order[env.head] - length + 1
+        env.place_body([pilot.cycle[(start + i) % pilot.cells] for i in range(length)])
+
+    worst = 0.0
+    made = 0
+    start = time.perf_counter()
+    while made < decisions and not env.done:
+        t0 = time.perf_counter()
+        action = pilot.act(env)
+        worst = max(worst, time.perf_counter() - t0)
+        env.step(action)
+        made += 1
+    elapsed = time.perf_counter() - start
+    return made, elapsed, worst, env
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snake autopilot decisions per second by board size")
+    parser.add_argument("--sizes", default="30x20,60x40,120x80,240x160")
+    parser.add_argument("--fills", default="0,0.5,0.9,0.99")
+    parser.add_argument("--decisions", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'board':>9} {'fill':>5} {'decisions':>9} {'dec/s':>10} {'worst ms':>9} {'budget':>7}  result")
+    for size in args.sizes.split(","):
+        cols, rows = map(int, size.split("x"))
+        for fill in map(float, args.fills.split(",")):
+            made, elapsed, worst, env = bench(cols, rows, fill, args.decisions)
+            result = "won" if env.won else "died" if env.done else f"len {env.length}"
+            ok = "ok" if worst * 1000 < HARD_TICK_MS else "over"
+            print(f"{size:>9} {fill:>5.2f} {made:>9} {made / elapsed:>10.0f} {worst * 1000:>9.2f} {ok:>7}  {result}")
+
+
+if __name__ == "__main__":
+    main()
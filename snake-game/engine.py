@@ -0,0 +1,166 @@
+import random
+from array import array
+
+# --- Board ---
+# The default board matches the original 600x400 window on a 20 px grid.
+COLS, ROWS = 30, 20
+START_LENGTH = 3
+
+# --- Actions ---
+UP, RIGHT, DOWN, LEFT, NOOP = 0, 1, 2, 3, 4
+DELTAS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+def is_turn(direction, action):
+    # Only 90 degree turns change direction; reversing or repeating is ignored.
+    return action < NOOP and (action - direction) % 2 == 1
+
+
+class SnakeEnv:
+    """Display-free Snake rules: ``reset(seed)`` then ``step(action)`` once per tick.
+
+    Cells are packed as ``y * cols + x``. The body is a ring buffer of packed cells
+    (uint16 while the board fits) next to a byte-per-cell occupancy grid, so moving,
+    growing and self-collision are all O(1) whatever the snake's length.
+
+    Free cells are tracked in a swap-remove array (``free[:n_free]``) with a position
+    map, so food is sampled uniformly from empty cells in O(1) even on a nearly full
+    board. The game is won once the snake's length reaches the number of cells.
+    """
+
+    def __init__(self, cols=COLS, rows=ROWS):
+        self.cols = cols
+        self.rows = rows
+        self.reset()
+
+    def reset(self, seed=None):
+        self.seed = seed
+        if getattr(self, "rng", None) is None:
+            self.rng = random.Random(seed)
+        else:
+            self.rng.seed(seed)
+        self.head_x = self.cols // 2
+        self.head_y = self.rows // 2
+        self.direction = RIGHT
+        self.length = START_LENGTH
+
+        cells = self.cols * self.rows
+        if getattr(self, "occupied", None) is None or len(self.occupied) != cells:
+            code = "H" if cells <= 0x10000 else "I"
+            self.ring = array(code, bytes(array(code).itemsize * cells))
+            self._all_cells = array(code, range(cells))
+        self.occupied = bytearray(cells)
+        self.free = self._all_cells[:]
+        self.free_pos = self._all_cells[:]
+        self.n_free = cells
+        self.tail_ptr = 0
+        self.count = 0
+        for i in range(START_LENGTH - 1, -1, -1):
+            self._push(self.head_y * self.cols + self.head_x - i)
+        self.vacated = -1
+        self.ticks = 0
+        self.done = False
+        self.won = False
+        self.food = self._place_food()
+        return self
+
+    @property
+    def tail(self):
+        return self.ring[self.tail_ptr]
+
+    def __len__(self):
+        return self.count
+
+    def segments(self):
+        # Tail first, head last.
+        ring, cap = self.ring, len(self.ring)
+        for i in range(self.tail_ptr, self.tail_ptr + self.count):
+            yield ring[i % cap]
+
+    def _push(self, cell):
+        self.ring[(self.tail_ptr + self.count) % len(self.ring)] = cell
+        self.count += 1
+        self.occupied[cell] = 1
+        self.head = cell
+        # Swap the cell with the last free entry and shrink the free prefix.
+        free, pos = self.free, self.free_pos
+        self.n_free -= 1
+        i, last = pos[cell], free[self.n_free]
+        free[i], pos[last] = last, i
+        free[self.n_free], pos[cell] = cell, self.n_free
+
+    def _pop_tail(self):
+        cell = self.ring[self.tail_ptr]
+        self.tail_ptr = (self.tail_ptr + 1) % len(self.ring)
+        self.count -= 1
+        self.occupied[cell] = 0
+        free, pos = self.free, self.free_pos
+        i, first = pos[cell], free[self.n_free]
+        free[i], pos[first] = first, i
+        free[self.n_free], pos[cell] = cell, self.n_free
+        self.n_free += 1
+        return cell
+
+    def place_body(self, cells):
+        # Restart from a given body (tail first), e.g. a near-full board for benchmarks.
+        while self.count:
+            self._pop_tail()
+        for cell in cells:
+            self._push(cell)
+        self.head_x, self.head_y = self.cell_xy(self.head)
+        if len(cells) > 1:
+            dx, dy = self.head_x - cells[-2] % self.cols, self.head_y - cells[-2] // self.cols
+            self.direction = DELTAS.index((dx, dy))
+        self.length = len(cells)
+        self.vacated = -1
+        self.ticks = 0
+        self.done = self.won = False
+        self.food = self._place_food()
+        return self
+
+    @property
+    def score(self):
+        return self.length - START_LENGTH
+
+    def cell_xy(self, cell):
+        return cell % self.cols, cell // self.cols
+
+    def _place_food(self):
+        return self.free[int(self.rng.random() * self.n_free)]
+
+    def step(self, action=NOOP):
+        """Advance one tick. Returns ``(reward, done)`` with reward 1 for food, -1 for death."""
+        if self.done:
+            return 0, True
+        if is_turn(self.direction, action):
+            self.direction = action
+        dx, dy = DELTAS[self.direction]
+        self.head_x += dx
+        self.head_y += dy
+        self.ticks += 1
+        self.vacated = -1
+
+        if not (0 <= self.head_x < self.cols and 0 <= self.head_y < self.rows):
+            self.done = True
+            return -1, True
+
+        head = self.head_y * self.cols + self.head_x
+        # Drop the tail first so moving into the cell it vacates is legal.
+        if self.count >= self.length:
+            self.vacated = self._pop_tail()
+
+        if self.occupied[head]:
+            self.done = True
+            return -1, True
+        self._push(head)
+
+        if head == self.food:
+            # Growth shows up on the next tick, when the tail is kept in place.
+            self.length += 1
+            if self.length == self.cols * self.rows:
+                self.food = -1
+                self.done = self.won = True
+                return 1, True
+            self.food = self._place_food()
+            return 1, False
+        return 0, False
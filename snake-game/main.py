@@ -2,9 +2,12 @@ import pygame
 import time
 import random
 import sys
-import json
 import os
 
+from engine import SnakeEnv, COLS, ROWS, UP, RIGHT, DOWN, LEFT, NOOP, is_turn
+from autopilot import Autopilot
+from replay import ReplayWriter, EXTENSION
+
 pygame.init()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,6 +15,16 @@ bg_music = os.path.join(BASE_DIR, "assets", "background.mp3")
 eat_music = os.path.join(BASE_DIR, "assets", "eat.wav")
 game_over_music = os.path.join(BASE_DIR, "assets", "game_over.wav")
 high_score_file = os.path.join(BASE_DIR, "assets", "highscores.json")
+replay_dir = os.path.join(BASE_DIR, "assets", "replays")
+
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from common.highscores import HighScores
+from common.scenes import QUIT, Scene, SceneManager
+from common.text_cache import get_font, render_text
+from renderer import SnakeRenderer
+
+# Loaded once; new scores are written behind in the background.
+high_scores = HighScores(high_score_file, ["easy", "medium", "hard"], limit=5)
 
 
 pygame.mixer.init()
@@ -23,13 +36,11 @@ eat_sound = pygame.mixer.Sound(eat_music)
 game_over_sound = pygame.mixer.Sound(game_over_music)
 
 # --- Fonts ---
-font_style = pygame.font.SysFont("bahnschrift", 25)
-score_font = pygame.font.SysFont("comicsansms", 35)
-menu_font = pygame.font.SysFont("comicsansms", 40)
-title_font = pygame.font.SysFont("comicsansms", 60)
+font_style = get_font("bahnschrift", 25, sysfont=True)
+menu_font = get_font("comicsansms", 40, sysfont=True)
+title_font = get_font("comicsansms", 60, sysfont=True)
 
 # --- Global Settings ---
-block_size = 20
 current_theme = {
     "background": (50, 153, 213),
     "snake": (0, 255, 0)
@@ -43,54 +54,46 @@ themes = {
 }
 
 def draw_text_center(text, font, color, surface, y_offset=0):
-    text_obj = font.render(text, True, color)
+    text_obj = render_text(font, text, color)
     text_rect = text_obj.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2 + y_offset))
     surface.blit(text_obj, text_rect)
 
-def score_display(score, surface):
-    value = score_font.render("Score: " + str(score), True, (213, 50, 80))
-    surface.blit(value, [10, 10])
-
-def draw_snake(block_size, snake_list, surface, snake_color):
-    for block in snake_list:
-        pygame.draw.rect(surface, snake_color, [block[0], block[1], block_size, block_size])
-
 def message(msg, color, surface, width, height):
-    mesg = font_style.render(msg, True, color)
+    mesg = render_text(font_style, msg, color)
     surface.blit(mesg, [width / 6, height / 3])
 
-def difficulty_menu(window):
-    selecting = True
-    while selecting:
+class DifficultyScene(Scene):
+    def __init__(self, theme, autopilot=False):
+        self.theme = theme
+        self.autopilot = autopilot
+
+    def draw(self, window):
         window.fill((100, 100, 100))
         draw_text_center("Select Difficulty", menu_font, (255, 255, 255), window, -100)
         draw_text_center("1. Easy (10 FPS)", font_style, (0, 255, 0), window, -30)
         draw_text_center("2. Medium (15 FPS)", font_style, (255, 255, 0), window, 10)
         draw_text_center("3. Hard (25 FPS)", font_style, (255, 0, 0), window, 50)
-
         pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key in [pygame.K_1, pygame.K_KP1]:
-                    return 10
-                elif event.key in [pygame.K_2, pygame.K_KP2]:
-                    return 15
-                elif event.key in [pygame.K_3, pygame.K_KP3]:
-                    return 25
-
-def select_theme_menu(window):
-    selecting = True
-    while selecting:
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key in [pygame.K_1, pygame.K_KP1]:
+                return PlayScene(self.theme, 10, self.autopilot)
+            elif event.key in [pygame.K_2, pygame.K_KP2]:
+                return PlayScene(self.theme, 15, self.autopilot)
+            elif event.key in [pygame.K_3, pygame.K_KP3]:
+                return PlayScene(self.theme, 25, self.autopilot)
+
+class ThemeScene(Scene):
+    def __init__(self, autopilot=False):
+        self.autopilot = autopilot
+        self.options = list(themes.items())
+
+    def draw(self, window):
         window.fill((50, 50, 50))
         draw_text_center("Select Theme", menu_font, (255, 255, 255), window, -150)
 
-        options = list(themes.items())
-        for idx, (theme_name, colors) in enumerate(options):
+        for idx, (theme_name, colors) in enumerate(self.options):
             y_offset = -50 + idx * 100
             draw_text_center(f"{idx + 1}. {theme_name}", font_style, (255, 255, 255), window, y_offset - 30)
 
@@ -102,258 +105,214 @@ def select_theme_menu(window):
 
         pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key in [pygame.K_1, pygame.K_KP1]:
-                    return options[0][1]
-                elif event.key in [pygame.K_2, pygame.K_KP2]:
-                    return options[1][1]
-                elif event.key in [pygame.K_3, pygame.K_KP3]:
-                    return options[2][1]
-
-def main_menu(window):
-    while True:
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key in [pygame.K_1, pygame.K_KP1]:
+                return DifficultyScene(self.options[0][1], self.autopilot)
+            elif event.key in [pygame.K_2, pygame.K_KP2]:
+                return DifficultyScene(self.options[1][1], self.autopilot)
+            elif event.key in [pygame.K_3, pygame.K_KP3]:
+                return DifficultyScene(self.options[2][1], self.autopilot)
+
+class MainMenuScene(Scene):
+    def draw(self, window):
         window.fill((30, 30, 30))
         draw_text_center("Snake Game", title_font, (0, 255, 0), window, -180)
 
-        draw_text_center("1. Play", menu_font, (255, 255, 255), window, -60)
-        draw_text_center("2. High Scores", menu_font, (255, 255, 255), window, 20)
-        draw_text_center("3. Quit", menu_font, (255, 255, 255), window, 100)
+        draw_text_center("1. Play", menu_font, (255, 255, 255), window, -80)
+        draw_text_center("2. Autopilot", menu_font, (255, 255, 255), window, -10)
+        draw_text_center("3. High Scores", menu_font, (255, 255, 255), window, 60)
+        draw_text_center("4. Quit", menu_font, (255, 255, 255), window, 130)
 
         pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_1:
+                return ThemeScene()
+            elif event.key == pygame.K_2:
+                return ThemeScene(autopilot=True)
+            elif event.key == pygame.K_3:
+                return HighScoresScene()
+            elif event.key == pygame.K_4:
+                return QUIT
+
+class HighScoresScene(Scene):
+    def draw(self, window):
+        font = get_font("Arial", 30, sysfont=True)
+        message_font = get_font("Arial", 25, sysfont=True)
 
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    selected_theme = select_theme_menu(window)  # ✅ Use your existing theme selector
-                    game_loop(window, selected_theme)
-                elif event.key == pygame.K_2:
-                    view_highscores(window)
-                elif event.key == pygame.K_3:
-                    pygame.quit()
-                    sys.exit()
-
-def view_highscores(window):
-    highscores = load_highscores()
-
-    font = pygame.font.SysFont("Arial", 30)
-    message_font = pygame.font.SysFont("Arial", 25)
-
-    while True:
         window.fill(current_theme["background"])
 
         # Display Title
-        title_text = font.render("High Scores", True, (255, 255, 255))
+        title_text = render_text(font, "High Scores", (255, 255, 255))
         window.blit(title_text, (window.get_width() // 2 - title_text.get_width() // 2, 50))
 
         # Display High Scores for each difficulty
         y_offset = 100
         for difficulty in ["easy", "medium", "hard"]:
-            difficulty_text = message_font.render(f"{difficulty.capitalize()}:", True, (255, 255, 255))
+            difficulty_text = render_text(message_font, f"{difficulty.capitalize()}:", (255, 255, 255))
             window.blit(difficulty_text, (50, y_offset))
 
-            scores = highscores[difficulty]
+            scores = high_scores.top(difficulty)
             for idx, score in enumerate(scores):
-                score_text = message_font.render(f"{idx + 1}. {score['name']} - {score['score']}", True, (255, 255, 255))
+                score_text = render_text(message_font, f"{idx + 1}. {score['name']} - {score['score']}", (255, 255, 255))
                 window.blit(score_text, (50, y_offset + (idx + 1) * 30))
 
             y_offset += (len(scores) + 1) * 30  # Move to the next difficulty's high score
 
         # Message to return to the main menu
-        return_text = message_font.render("Press M to Return to Menu", True, (255, 0, 0))
+        return_text = render_text(message_font, "Press M to Return to Menu", (255, 0, 0))
         window.blit(return_text, (window.get_width() // 2 - return_text.get_width() // 2, window.get_height() - 50))
 
         pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_m:
-                    return  # Go back to the main menu
-
-def pause_game(window, width, height):
-    paused = True
-    while paused:
-        window.fill(current_theme["background"])
-        message("Game Paused - Press R to Resume or Q to Quit", (255, 255, 255), window, width, height)
-        pygame.display.update()
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+            return MainMenuScene()  # Go back to the main menu
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    pygame.quit()
-                    sys.exit()
-                elif event.key == pygame.K_r:
-                    paused = False
-
-def load_highscores():
-    try:
-        with open(high_score_file, "r") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {"easy": [], "medium": [], "hard": []}  # Default empty high scores
-
-def save_highscores(highscores):
-    with open(high_score_file, "w") as file:
-        json.dump(highscores, file)
-        
-def get_player_name(window, width, height):
-    font = pygame.font.SysFont("Arial", 30)
-    name = ""
-    input_active = True
-
-    while input_active:
-        window.fill(current_theme["background"])
-        text_surface = font.render(f"Enter your name to enter HighScore Table: {name}", True, (255, 255, 255))
-        window.blit(text_surface, (width // 2 - text_surface.get_width() // 2, height // 2))
+class PauseScene(Scene):
+    def __init__(self, play):
+        self.play = play
 
+    def draw(self, window):
+        window.fill(self.play.theme["background"])
+        message("Game Paused - Press R to Resume or Q to Quit", (255, 255, 255), window, window.get_width(), window.get_height())
         pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                input_active = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and len(name) > 0:  # If Enter is pressed and name is not empty
-                    return name
-                elif event.key == pygame.K_BACKSPACE:  # If Backspace is pressed, remove last character
-                    name = name[:-1]
-                elif len(name) < 20:  # Max length of name
-                    name += event.unicode  # Add the pressed character to name
-
-    return name
-
-def game_loop(window, current_theme):
-    highscore_entered = False  # Reset highscore entry flag
-    
-    snake_speed = difficulty_menu(window)
-    difficulty_key = {10: "easy", 15: "medium", 25: "hard"}[snake_speed]
-
-    width, height = 600, 400
-    window = pygame.display.set_mode((width, height), pygame.RESIZABLE)
-    pygame.display.set_caption('Snake Game')
-
-    game_over = False
-    game_close = False
-
-    x = width // 2
-    y = height // 2
-    x_change = block_size
-    y_change = 0
-
-    # Proper snake facing left (head is leftmost)
-    snake_list = [
-        [x - block_size * i, y]
-        for i in range(2, -1, -1)
-    ]
-    snake_length = len(snake_list)
-
-    food_x = round(random.randrange(0, width - block_size) / 20.0) * 20.0
-    food_y = round(random.randrange(0, height - block_size) / 20.0) * 20.0
-
-    clock = pygame.time.Clock()
-
-    while not game_over:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                game_over = True
-            elif event.type == pygame.VIDEORESIZE:
-                width, height = event.w, event.h
-                window = pygame.display.set_mode((width, height), pygame.RESIZABLE)
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT and x_change == 0:
-                    x_change = -block_size
-                    y_change = 0
-                elif event.key == pygame.K_RIGHT and x_change == 0:
-                    x_change = block_size
-                    y_change = 0
-                elif event.key == pygame.K_UP and y_change == 0:
-                    y_change = -block_size
-                    x_change = 0
-                elif event.key == pygame.K_DOWN and y_change == 0:
-                    y_change = block_size
-                    x_change = 0
-                elif event.key == pygame.K_p:
-                    pause_game(window, width, height)
-
-        x += x_change
-        y += y_change
-
-        if x >= width or x < 0 or y >= height or y < 0:
-            pygame.mixer.Sound.play(game_over_sound)
-            game_close = True
-
-        window.fill(current_theme["background"])
-        pygame.draw.rect(window, (213, 50, 80), [food_x, food_y, block_size, block_size])
-
-        snake_head = [x, y]
-        snake_list.append(snake_head)
-        if len(snake_list) > snake_length:
-            del snake_list[0]
-
-        for segment in snake_list[:-1]:
-            if segment == snake_head:
-                pygame.mixer.Sound.play(game_over_sound)
-                game_close = True
-
-        draw_snake(block_size, snake_list, window, current_theme["snake"])
-        score_display(snake_length - 3, window)
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_q:
+                self.leave()
+                return QUIT
+            elif event.key == pygame.K_r:
+                return self.play
+
+    def leave(self):
+        self.play.leave()
+
+class NameEntryScene(Scene):
+    def __init__(self, play):
+        self.play = play
+        self.name = ""
+
+    def draw(self, window):
+        font = get_font("Arial", 30, sysfont=True)
+        window.fill(self.play.theme["background"])
+        text_surface = render_text(font, f"Enter your name to enter HighScore Table: {self.name}", (255, 255, 255))
+        window.blit(text_surface, (window.get_width() // 2 - text_surface.get_width() // 2, window.get_height() // 2))
         pygame.display.update()
 
-        if x == food_x and y == food_y:
-            pygame.mixer.Sound.play(eat_sound)
-            food_x = round(random.randrange(0, width - block_size) / 20.0) * 20.0
-            food_y = round(random.randrange(0, height - block_size) / 20.0) * 20.0
-            snake_length += 1
-
-        while game_close:
-            score = snake_length - 3
-            highscores = load_highscores()
-            current_scores = highscores[difficulty_key]
-
-            # Check if the player’s score qualifies for the high score list
-            if len(current_scores) < 5 or score > current_scores[-1]["score"]:
-                if not highscore_entered:  # We will use a flag to ensure the name is only entered once
-                    name = get_player_name(window, width, height)
-                    current_scores.append({"name": name, "score": score})
-                    current_scores = sorted(current_scores, key=lambda x: x["score"], reverse=True)[:5]
-                    highscores[difficulty_key] = current_scores
-                    save_highscores(highscores)
-                    highscore_entered = True  # Ensure that name is only entered once
-            else:
-                highscore_entered = True  # If the score isn't high enough, still set the flag
-
-            window.fill(current_theme["background"])
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN and len(self.name) > 0:  # If Enter is pressed and name is not empty
+                play = self.play
+                high_scores.add(play.difficulty, self.name, play.env.score, replay=os.path.basename(play.replay.path))
+                return GameOverScene(play)
+            elif event.key == pygame.K_BACKSPACE:  # If Backspace is pressed, remove last character
+                self.name = self.name[:-1]
+            elif len(self.name) < 20:  # Max length of name
+                self.name += event.unicode  # Add the pressed character to name
+
+class GameOverScene(Scene):
+    def __init__(self, play):
+        self.theme = play.theme
+        self.autopilot = play.autopilot
+        self.won = play.env.won
+
+    def draw(self, window):
+        width, height = window.get_size()
+        window.fill(self.theme["background"])
+        if self.won:
+            message("You Win! Press C to Replay or Q to Quit", (255, 0, 0), window, width, height)
+        else:
             message("Game Over! Press C to Replay or Q to Quit", (255, 0, 0), window, width, height)
-            pygame.display.update()
+        pygame.display.update()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_q:
+                return MainMenuScene()
+            elif event.key == pygame.K_c:
+                return DifficultyScene(self.theme, self.autopilot)  # Replay the game
+
+KEY_ACTIONS = {
+    pygame.K_UP: UP,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+}
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    game_over = True
-                    game_close = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        game_over = True
-                        game_close = False
-                    elif event.key == pygame.K_c:
-                        game_loop(window,current_theme)  # Replay the game
+class PlayScene(Scene):
+    def __init__(self, theme, snake_speed, autopilot=False):
+        self.theme = theme
+        self.fps = snake_speed
+        self.difficulty = {10: "easy", 15: "medium", 25: "hard"}[snake_speed]
+        self.autopilot = autopilot
+        self.started = False
+
+        # The rules live in SnakeEnv on a fixed grid; resizing the window only rescales
+        # the picture. This scene only reads input, draws and keeps time.
+        seed = random.getrandbits(63)
+        self.env = SnakeEnv(COLS, ROWS).reset(seed)
+        # Only games that can reach the score table are recorded; a demo left
+        # running would otherwise write replays forever.
+        self.replay = None
+        if not autopilot:
+            self.replay = ReplayWriter(os.path.join(replay_dir, f"{int(time.time())}-{seed:016x}{EXTENSION}"),
+                                       seed, self.difficulty, self.env.cols, self.env.rows)
+        self.renderer = SnakeRenderer(theme, self.env.cols, self.env.rows)
+        self.pilot = Autopilot(self.env.cols, self.env.rows) if autopilot else None
+        self.action = NOOP
+
+    def enter(self, manager):
+        if not self.started:
+            manager.set_mode((600, 400))
+            pygame.display.set_caption('Snake Game')
+            self.started = True
+        self.renderer.invalidate()
+
+    def handle_event(self, event):
+        if event.type == pygame.VIDEORESIZE:
+            self.renderer.invalidate()
+        elif event.type == pygame.KEYDOWN:
+            if self.pilot is None and event.key in KEY_ACTIONS and is_turn(self.env.direction, KEY_ACTIONS[event.key]):
+                self.action = KEY_ACTIONS[event.key]
+            elif event.key == pygame.K_p:
+                return PauseScene(self)
+
+    def update(self):
+        env = self.env
+        action, self.action = self.action, NOOP
+        if self.pilot is not None:
+            action = self.pilot.act(env)
+        if self.replay is not None:
+            self.replay.record(action)
+        reward, done = env.step(action)
+        if reward > 0:
+            pygame.mixer.Sound.play(eat_sound)
+        if done:
+            if not env.won:
+                pygame.mixer.Sound.play(game_over_sound)
+            self.leave()
+            # Bot games never enter the high score table
+            if not self.autopilot and high_scores.qualifies(self.difficulty, env.score):
+                return NameEntryScene(self)
+            return GameOverScene(self)
 
+    def draw(self, window):
+        self.renderer.draw(window, self.env)
 
-        clock.tick(snake_speed)
+    def leave(self):
+        # Write out the buffered inputs; an unfinished game is still a valid
+        # replay prefix.
+        if self.replay is not None:
+            self.replay.close()
 
 # Start from main menu
 window = pygame.display.set_mode((600, 400), pygame.RESIZABLE)
-main_menu(window)
\ No newline at end of file
+manager = SceneManager(window, MainMenuScene(), resizable=True)
+manager.run()
+if manager.scene is not QUIT:
+    manager.scene.leave()  # the window was closed mid-scene
+pygame.quit()
@@ -0,0 +1,151 @@
+import numpy as np
+import pygame
+
+from common.text_cache import get_font, render_text
+
+block_size = 20
+food_color = (213, 50, 80)
+
+
+def score_display(score, surface):
+    font = get_font("comicsansms", 35, sysfont=True)
+    value = render_text(font, "Score: " + str(score), food_color)
+    return surface.blit(value, [10, 10])
+
+def draw_snake(block_size, env, surface, snake_color):
+    for cell in env.segments():
+        x, y = env.cell_xy(cell)
+        pygame.draw.rect(surface, snake_color, [x * block_size, y * block_size, block_size, block_size])
+
+def scale_index(src, dst):
+    # For each of dst pixels, the source pixel pygame.transform.scale samples when
+    # stretching src pixels to dst. Found by scaling a row whose colours are its own
+    # indices, so it matches pygame's rounding exactly.
+    ramp = np.zeros((src, 1, 3), dtype=np.uint8)
+    ramp[:, 0, 0] = np.arange(src) & 255
+    ramp[:, 0, 1] = np.arange(src) >> 8
+    row = pygame.surfarray.array3d(pygame.transform.scale(pygame.surfarray.make_surface(ramp), (dst, 1)))[:, 0]
+    return row[:, 0].astype(np.intp) | row[:, 1].astype(np.intp) << 8
+
+class SnakeRenderer:
+    # Draws the board at a fixed logical resolution (cols x rows cells of block_size
+    # pixels) and scales it to the window, so the playfield and its drawing cost do
+    # not depend on the window size. Each tick only the cells that changed (new
+    # head, vacated tail, food) and the score are repainted and uploaded. Call
+    # invalidate() after a resize, theme change or overlay to force a full repaint.
+    def __init__(self, theme, cols, rows):
+        self.theme = theme
+        self.board = pygame.Surface((cols * block_size, rows * block_size))
+        self.viewport = self.board.get_rect()
+        self.x_index = self.y_index = None
+        self.needs_full = True
+        self.food = -1
+        self.score = None
+        self.score_rect = pygame.Rect(0, 0, 0, 0)
+
+    def invalidate(self):
+        self.needs_full = True
+
+    def cell_rect(self, env, cell):
+        x, y = env.cell_xy(cell)
+        return pygame.Rect(x * block_size, y * block_size, block_size, block_size)
+
+    def paint_cell(self, env, cell):
+        if env.occupied[cell]:
+            color = self.theme["snake"]
+        elif cell == env.food:
+            color = food_color
+        else:
+            color = self.theme["background"]
+        return self.board.fill(color, self.cell_rect(env, cell))
+
+    def clear_score(self, env):
+        # Clear the score text and restore the few cells underneath it.
+        rect = self.score_rect
+        self.board.fill(self.theme["background"], rect)
+        x0, y0 = rect.left // block_size, rect.top // block_size
+        x1 = min(env.cols, (rect.right + block_size - 1) // block_size)
+        y1 = min(env.rows, (rect.bottom + block_size - 1) // block_size)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                cell = y * env.cols + x
+                if env.occupied[cell] or cell == env.food:
+                    self.paint_cell(env, cell)
+
+    def fit_viewport(self, window):
+        # Largest rect with the board's aspect ratio, centred in the window.
+        bw, bh = self.board.get_size()
+        ww, wh = window.get_size()
+        scale = min(ww / bw, wh / bh)
+        rect = pygame.Rect(0, 0, max(1, int(bw * scale)), max(1, int(bh * scale)))
+        rect.center = (ww // 2, wh // 2)
+        return rect
+
+    def draw(self, window, env):
+        board = self.board
+        if self.needs_full:
+            board.fill(self.theme["background"])
+            if env.food >= 0:
+                board.fill(food_color, self.cell_rect(env, env.food))
+            draw_snake(block_size, env, board, self.theme["snake"])
+            self.score_rect = score_display(env.score, board)
+            self.food, self.score = env.food, env.score
+            self.needs_full = False
+
+            viewport = self.fit_viewport(window)
+            if viewport.size != self.viewport.size or self.x_index is None:
+                self.x_index = scale_index(board.get_width(), viewport.w)
+                self.y_index = scale_index(board.get_height(), viewport.h)
+            self.viewport = viewport
+            if viewport.size != window.get_size():
+                window.fill((0, 0, 0))
+            if viewport.size == board.get_size():
+                window.blit(board, viewport)
+            else:
+                pygame.transform.scale(board, viewport.size, window.subsurface(viewport))
+            pygame.display.update()
+            return
+
+        dirty = []
+        if env.vacated >= 0:
+            dirty.append(self.paint_cell(env, env.vacated))
+        dirty.append(self.paint_cell(env, env.head))
+        if env.food != self.food:
+            if env.food >= 0:
+                dirty.append(self.paint_cell(env, env.food))
+            self.food = env.food
+
+        if env.score != self.score:
+            old = self.score_rect
+            self.clear_score(env)
+            self.score_rect = score_display(env.score, board)
+            self.score = env.score
+            dirty.append(old.union(self.score_rect))
+        elif self.score_rect.collidelist(dirty) != -1:
+            # The score is drawn over the board, so put it back on top. Antialiased
+            # text blended onto itself darkens, so clear it first.
+            self.clear_score(env)
+            score_display(env.score, board)
+            dirty.append(self.score_rect)
+
+        vp = self.viewport
+        if vp.size == board.get_size():
+            updates = [window.blit(board, rect.move(vp.topleft), rect) for rect in dirty]
+            pygame.display.update(updates)
+            return
+
+        # Scaled: each changed rect is resampled with the same pixel mapping the
+        # full-board scale used, so the window matches a full repaint exactly.
+        # Scaling rects on their own rounds their edges differently and leaves seams.
+        updates = []
+        pixels = pygame.surfarray.pixels3d(board)
+        for rect in dirty:
+            rect = rect.clip(board.get_rect())
+            x0, x1 = np.searchsorted(self.x_index, (rect.left, rect.right))
+            y0, y1 = np.searchsorted(self.y_index, (rect.top, rect.bottom))
+            if x0 == x1 or y0 == y1:
+                continue
+            patch = pixels[np.ix_(self.x_index[x0:x1], self.y_index[y0:y1])]
+            updates.append(window.blit(pygame.surfarray.make_surface(patch), (vp.x + x0, vp.y + y0)))
+        del pixels  # unlock the board
+        pygame.display.update(updates)
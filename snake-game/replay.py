@@ -0,0 +1,134 @@
+import argparse
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import SnakeEnv, NOOP
+
+# --- Format ---
+# Header: magic, version, difficulty index, RNG seed, board cols, board rows.
+# Body: one input byte per tick (the action handed to SnakeEnv.step).
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBQHH")
+DIFFICULTIES = ("easy", "medium", "hard")
+TICK_RATES = {"easy": 10, "medium": 15, "hard": 25}
+EXTENSION = ".snkr"
+
+ReplayResult = namedtuple("ReplayResult", "path difficulty score ticks finished valid reason")
+
+
+class ReplayWriter:
+    # Appends each tick's input as the game runs; the file is always a valid
+    # prefix of the game so far.
+    def __init__(self, path, seed, difficulty, cols, rows, flush_every=64):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, DIFFICULTIES.index(difficulty), seed, cols, rows))
+        self.pending = bytearray()
+        self.flush_every = flush_every
+
+    def record(self, action):
+        self.pending.append(action)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write(self.pending)
+            self.pending.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def read_replay(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise ValueError("truncated header")
+    magic, version, difficulty, seed, cols, rows = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a snake replay")
+    if difficulty >= len(DIFFICULTIES):
+        raise ValueError("unknown difficulty")
+    return DIFFICULTIES[difficulty], seed, cols, rows, memoryview(data)[HEADER.size:]
+
+
+def verify(path, claimed_score=None):
+    """Re-simulate a replay headless and check it against an optional claimed score."""
+    try:
+        difficulty, seed, cols, rows, inputs = read_replay(path)
+    except (OSError, ValueError) as exc:
+        return ReplayResult(path, None, 0, 0, False, False, str(exc))
+
+    env = SnakeEnv(cols, rows).reset(seed)
+    step = env.step
+    for tick, action in enumerate(inputs):
+        if action > NOOP:
+            return ReplayResult(path, difficulty, env.score, tick, False, False, "bad input byte")
+        if env.done:
+            return ReplayResult(path, difficulty, env.score, tick, True, False, "inputs after game over")
+        step(action)
+
+    if claimed_score is not None and claimed_score != env.score:
+        reason = f"claimed {claimed_score}, replay scores {env.score}"
+        return ReplayResult(path, difficulty, env.score, env.ticks, env.done, False, reason)
+    return ReplayResult(path, difficulty, env.score, env.ticks, env.done, True, "")
+
+
+def _verify_args(args):
+    return verify(*args)
+
+
+def replay_paths(targets):
+    for target in targets:
+        if os.path.isdir(target):
+            for name in sorted(os.listdir(target)):
+                if name.endswith(EXTENSION):
+                    yield os.path.join(target, name)
+        else:
+            yield target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify Snake replays by re-simulating them headless")
+    parser.add_argument("targets", nargs="+", help="replay files or directories of replays")
+    parser.add_argument("--score", type=int, help="expected score (single replay)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--quiet", action="store_true", help="only report failures and totals")
+    args = parser.parse_args()
+
+    jobs = [(path, args.score) for path in replay_paths(args.targets)]
+    start = time.perf_counter()
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(args.jobs) as pool:
+            results = list(pool.map(_verify_args, jobs, chunksize=max(1, len(jobs) // (args.jobs * 8))))
+    else:
+        results = [verify(*job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if not result.valid:
+            failed += 1
+        if not result.valid or not args.quiet:
+            status = "ok" if result.valid else f"FAIL ({result.reason})"
+            print(f"{result.path}: {result.difficulty} score={result.score} ticks={result.ticks} {status}")
+
+    ticks = sum(result.ticks for result in results)
+    game_seconds = sum(result.ticks / TICK_RATES.get(result.difficulty, 10) for result in results)
+    print(f"{len(results)} replays, {failed} failed, {ticks} ticks in {elapsed:.2f}s "
+          f"({ticks / max(elapsed, 1e-9):,.0f} ticks/s, {game_seconds / max(elapsed, 1e-9):,.0f}x real time)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
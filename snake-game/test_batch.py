@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from autopilot import Autopilot
+from batch import BatchSnakeEnv
+from engine import RIGHT, SnakeEnv
+
+
+def play_both(cols, rows, actions):
+    # Step SnakeEnv and a one-board BatchSnakeEnv with the same actions. Their
+    # food comes from different generators, so the batch board is handed the
+    # engine's food; everything else must follow from the rules.
+    env = SnakeEnv(cols, rows).reset(3)
+    batch = BatchSnakeEnv(1, cols, rows, seed=3)
+    batch.food[0] = env.food
+    done = False
+    while not done:
+        action = actions(env)
+        reward, done = env.step(action)
+        batch_reward, batch_done = batch.step(np.array([action]))
+        assert (reward, done, env.won) == (batch_reward[0], batch_done[0], batch.won[0]), f"tick {env.ticks}"
+        assert list(env.occupied) == batch.occupied[0].tolist(), f"tick {env.ticks}"
+        if not done:
+            batch.food[0] = env.food
+    return env, batch
+
+
+def test_filling_the_board_wins_in_both():
+    env, batch = play_both(4, 1, lambda env: RIGHT)
+    assert env.won and batch.won[0] and batch.food[0] == -1
+
+
+@pytest.mark.parametrize("cols, rows", [(4, 2), (4, 4), (6, 4)])
+def test_batch_matches_engine_until_the_board_is_full(cols, rows):
+    pilot = Autopilot(cols, rows)
+    env, batch = play_both(cols, rows, pilot.act)
+    assert env.won and batch.won[0]
+    assert batch.reset_done().tolist() == [0] and not batch.won[0]
@@ -0,0 +1,45 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from autopilot import Autopilot
+from engine import COLS, ROWS, SnakeEnv
+from renderer import SnakeRenderer
+
+THEME = {"background": (50, 153, 213), "snake": (0, 255, 0)}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    pygame.font.init()
+    yield
+    pygame.quit()
+
+
+# Native size, then non-integer scales in both directions and a letterboxed one.
+@pytest.mark.parametrize("size", [(600, 400), (1000, 900), (613, 377), (1200, 800)])
+def test_incremental_frames_match_full_repaint(size):
+    window = pygame.display.set_mode(size)
+    env = SnakeEnv(COLS, ROWS).reset(1)
+    pilot = Autopilot(env.cols, env.rows)
+    renderer = SnakeRenderer(THEME, env.cols, env.rows)
+    renderer.draw(window, env)
+    for tick in range(300):
+        if env.step(pilot.act(env))[1]:
+            break
+        renderer.draw(window, env)
+        incremental = pygame.surfarray.array2d(window)
+        SnakeRenderer(THEME, env.cols, env.rows).draw(window, env)
+        full = pygame.surfarray.array2d(window)
+        wrong = np.count_nonzero(incremental != full)
+        assert wrong == 0, f"{wrong} px differ from a full repaint at tick {tick}"
+        pygame.surfarray.blit_array(window, incremental)
+    assert env.score > 0  # the score box was redrawn along the way
@@ -0,0 +1,150 @@
+SYMBOLS = ('X', 'O')
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def win_lines(size, k):
+    # Every k-long run of cells (rows, columns, both diagonals) as a bit mask.
+    lines = []
+    for row in range(size):
+        for col in range(size):
+            for dr, dc in DIRECTIONS:
+                end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    mask = 0
+                    for i in range(k):
+                        mask |= 1 << ((row + dr * i) * size + col + dc * i)
+                    lines.append(mask)
+    return lines
+
+
+def near_masks(size, radius):
+    # For each cell, the cells within ``radius`` steps in any direction (itself included).
+    masks = []
+    for cell in range(size * size):
+        row, col = divmod(cell, size)
+        mask = 0
+        for r in range(max(0, row - radius), min(size, row + radius + 1)):
+            for c in range(max(0, col - radius), min(size, col + radius + 1)):
+                mask |= 1 << (r * size + c)
+        masks.append(mask)
+    return masks
+
+
+class Board:
+    """N x N, k-in-a-row board stored as one integer bitboard per player.
+
+    Cell ``row * size + col`` is bit ``1 << cell``. The win lines through each
+    cell are precomputed, so ``play`` only tests the lines through the move just
+    made instead of rescanning the board. Players are 0 and 1 (``SYMBOLS`` maps
+    them to X and O); either may move first.
+    """
+
+    def __init__(self, size=3, k=None):
+        self.size = size
+        self.k = k or size
+        if not 1 <= self.k <= size:
+            raise ValueError("k must be between 1 and the board size")
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.lines = win_lines(size, self.k)
+        self.lines_through = [[] for _ in range(self.cells)]
+        for mask in self.lines:
+            bits = mask
+            while bits:
+                low = bits & -bits
+                self.lines_through[low.bit_length() - 1].append(mask)
+                bits ^= low
+        self.lines_through = [tuple(masks) for masks in self.lines_through]
+        self.reset()
+
+    def reset(self):
+        self.bits = [0, 0]
+        self.history = []
+        self.winner = None
+        return self
+
+    def copy(self):
+        # Same lines (shared, they never change), independent stones.
+        board = object.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.bits = self.bits[:]
+        board.history = self.history[:]
+        return board
+
+    # --- Moves ---
+
+    def play(self, cell, player):
+        """Place ``player``'s mark on an empty ``cell``; return the winner or None."""
+        if not 0 <= cell < self.cells:
+            raise ValueError(f"cell {cell} is off the board")
+        bit = 1 << cell
+        if (self.bits[0] | self.bits[1]) & bit:
+            raise ValueError(f"cell {cell} is taken")
+        self.bits[player] |= bit
+        self.history.append((cell, player))
+        if self.wins(cell, player):
+            self.winner = player
+        return self.winner
+
+    def undo(self):
+        cell, player = self.history.pop()
+        self.bits[player] ^= 1 << cell
+        self.winner = None
+        return cell
+
+    def wins(self, cell, player, bits=None):
+        # Does ``player`` (with the given stones, default the board's) own a whole
+        # line through ``cell``?
+        if bits is None:
+            bits = self.bits[player]
+        for mask in self.lines_through[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def winning_moves(self, player):
+        # Empty cells that would complete a line for ``player`` right away.
+        bits = self.bits[player]
+        return [cell for cell in self.empty_cells() if self.wins(cell, player, bits | 1 << cell)]
+
+    # --- Queries ---
+
+    @property
+    def empty(self):
+        return self.full & ~(self.bits[0] | self.bits[1])
+
+    def empty_cells(self):
+        cells = []
+        bits = self.empty
+        while bits:
+            low = bits & -bits
+            cells.append(low.bit_length() - 1)
+            bits ^= low
+        return cells
+
+    def near(self, masks):
+        # Empty cells inside the union of ``masks`` around every stone.
+        occupied = self.bits[0] | self.bits[1]
+        area, bits = 0, occupied
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            area |= masks[low.bit_length() - 1]
+        return area & ~occupied
+
+    def is_full(self):
+        return not self.empty
+
+    def is_over(self):
+        return self.winner is not None or self.is_full()
+
+    def at(self, row, col):
+        # Symbol at (row, col), or '' for an empty cell.
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise ValueError(f"({row}, {col}) is off the board")
+        bit = 1 << (row * self.size + col)
+        if self.bits[0] & bit:
+            return SYMBOLS[0]
+        if self.bits[1] & bit:
+            return SYMBOLS[1]
+        return ''
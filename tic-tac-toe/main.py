@@ -1,20 +1,39 @@
 import pygame
 import sys
 import random
-import time
 import os
-
-# Initialize Pygame
-pygame.init()
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 bg_music = os.path.join(BASE_DIR, "assets", "background_music.mp3")
 
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from common.scenes import QUIT, Scene, SceneManager
+from common.text_cache import render_text
+from bitboard import Board, SYMBOLS
+import tablebase
+from search import Searcher
+from mcts import MCTSPlayer
+from match_server import (
+    DEFAULT_PORT, DRAW, MATCHED, MOVED, MSG_MATCHED, MSG_MOVED, MSG_OVER, OPPONENT_LEFT, MatchClient,
+)
+
 # Constants
 WIDTH, HEIGHT = 600, 600
 GRID_SIZE = 3
+WIN_LENGTH = 3  # e.g. GRID_SIZE = 15, WIN_LENGTH = 5 for gomoku
 CELL_SIZE = WIDTH // GRID_SIZE
-LINE_WIDTH = 15
+LINE_WIDTH = max(2, CELL_SIZE // 13)
+MARK_SIZE = CELL_SIZE // 4
+THINK_TIME = 1.0  # seconds before the computer moves, and its search budget
+
+# Computer turn events: the thinking delay is over / the AI worker has a move.
+COMPUTER_READY = pygame.USEREVENT + 1
+COMPUTER_DONE = pygame.USEREVENT + 2
+NET_MESSAGE = pygame.USEREVENT + 3  # from the match server's reader thread
+
+server_address = ('127.0.0.1', DEFAULT_PORT)  # --server host:port
 
 # Themes: (bg_color, line_color, x_color, o_color, button_bg)
 THEMES = [
@@ -26,7 +45,16 @@ THEMES = [
 # Game State Variables
 current_theme = 0
 mode = None  # 'PvP' or 'PvC'
-symbols = ['X', 'O']
+opponent = 'classic'  # PvC computer: 'classic' (tablebase/search) or 'mcts'
+symbols = list(SYMBOLS)
+
+# MCTS rollout workers are forked here, while this is still one thread with no
+# SDL state for them to inherit.
+mcts_player = MCTSPlayer(GRID_SIZE, WIN_LENGTH)
+mcts_player.start()
+
+# Initialize Pygame
+pygame.init()
 
 # Fonts
 font = pygame.font.SysFont(None, 60)
@@ -40,36 +68,60 @@ pygame.mixer.music.play(-1)
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Tic-Tac-Toe")
 
+# Solved positions for perfect PvC play; 3x3 builds itself on first run, bigger
+# boards need `python tablebase.py --size N --k K` first.
+solved = tablebase.load(GRID_SIZE, WIN_LENGTH, generate_missing=GRID_SIZE <= 3)
+# Otherwise the computer searches, on a worker thread so the window stays live.
+searcher = Searcher(GRID_SIZE, WIN_LENGTH) if solved is None else None
+ai_worker = ThreadPoolExecutor(max_workers=1)
+
+def cell_at(pos):
+    # Board cell under a window position, or -1. When GRID_SIZE doesn't divide
+    # the window, the margin right of and below the grid is no cell.
+    x, y = pos
+    if not (0 <= x < GRID_SIZE * CELL_SIZE and 0 <= y < GRID_SIZE * CELL_SIZE):
+        return -1
+    return y // CELL_SIZE * GRID_SIZE + x // CELL_SIZE
+
 def draw_text(text, font, color, surface, x, y):
-    textobj = font.render(text, True, color)
+    textobj = render_text(font, text, color)
     textrect = textobj.get_rect(center=(x, y))
     surface.blit(textobj, textrect)
     return textrect
 
-def main_menu():
-    while True:
+class MainMenuScene(Scene):
+    fps = None
+
+    def draw(self, window):
         screen.fill((0, 0, 0))
         draw_text('Tic-Tac-Toe', font, (255, 255, 255), screen, WIDTH//2, HEIGHT//4)
-        draw_text('1. Play PvP', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 - 40)
-        draw_text('2. Play PvC', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2)
-        draw_text('3. Exit', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 + 40)
+        draw_text('1. Play PvP', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 - 80)
+        draw_text('2. Play PvC', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 - 40)
+        draw_text('3. Play PvC (MCTS)', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2)
+        draw_text('4. Play Online', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 + 40)
+        draw_text('5. Exit', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 + 80)
         pygame.display.flip()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    return 'PvP'
-                elif event.key == pygame.K_2:
-                    return 'PvC'
-                elif event.key == pygame.K_3:
-                    pygame.quit()
-                    sys.exit()
-
-def choose_theme():
-    while True:
+    def handle_event(self, event):
+        global mode, opponent
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_1:
+                mode = 'PvP'
+                return ChooseThemeScene()
+            elif event.key in (pygame.K_2, pygame.K_3):
+                mode = 'PvC'
+                opponent = 'classic' if event.key == pygame.K_2 else 'mcts'
+                return ChooseThemeScene()
+            elif event.key == pygame.K_4:
+                mode = 'Online'
+                return ChooseThemeScene()
+            elif event.key == pygame.K_5:
+                return QUIT
+
+class ChooseThemeScene(Scene):
+    fps = None
+
+    def draw(self, window):
         screen.fill((0, 0, 0))
         draw_text('Choose Theme', font, (255, 255, 255), screen, WIDTH//2, HEIGHT//4)
         draw_text('1. Dark', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 - 40)
@@ -77,151 +129,256 @@ def choose_theme():
         draw_text('3. Pastel', small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2 + 40)
         pygame.display.flip()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    return 0
-                elif event.key == pygame.K_2:
-                    return 1
-                elif event.key == pygame.K_3:
-                    return 2
-
-def draw_board(board, colors):
-    screen.fill(colors[0])
-
-    for x in range(1, GRID_SIZE):
-        pygame.draw.line(screen, colors[1], (0, x * CELL_SIZE), (WIDTH, x * CELL_SIZE), LINE_WIDTH)
-        pygame.draw.line(screen, colors[1], (x * CELL_SIZE, 0), (x * CELL_SIZE, HEIGHT), LINE_WIDTH)
-
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            mark = board[row][col]
-            center = (col * CELL_SIZE + CELL_SIZE//2, row * CELL_SIZE + CELL_SIZE//2)
-            if mark == 'X':
-                pygame.draw.line(screen, colors[2], (center[0]-50, center[1]-50), (center[0]+50, center[1]+50), LINE_WIDTH)
-                pygame.draw.line(screen, colors[2], (center[0]+50, center[1]-50), (center[0]-50, center[1]+50), LINE_WIDTH)
-            elif mark == 'O':
-                pygame.draw.circle(screen, colors[3], center, 50, LINE_WIDTH)
-
+    def handle_event(self, event):
+        global current_theme
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_1, pygame.K_2, pygame.K_3):
+                current_theme = event.key - pygame.K_1
+                if mode == 'Online':
+                    return OnlineScene(current_theme)
+                return PlayScene(mode, current_theme, opponent)
+
+# Pre-rendered per theme: the empty grid and one sprite per mark.
+theme_sprites = {}
+
+def get_sprites(theme_index):
+    if theme_index not in theme_sprites:
+        colors = THEMES[theme_index]
+        grid = pygame.Surface((WIDTH, HEIGHT)).convert()
+        grid.fill(colors[0])
+        for x in range(1, GRID_SIZE):
+            pygame.draw.line(grid, colors[1], (0, x * CELL_SIZE), (WIDTH, x * CELL_SIZE), LINE_WIDTH)
+            pygame.draw.line(grid, colors[1], (x * CELL_SIZE, 0), (x * CELL_SIZE, HEIGHT), LINE_WIDTH)
+
+        center = CELL_SIZE // 2
+        x_mark = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+        pygame.draw.line(x_mark, colors[2], (center-MARK_SIZE, center-MARK_SIZE), (center+MARK_SIZE, center+MARK_SIZE), LINE_WIDTH)
+        pygame.draw.line(x_mark, colors[2], (center+MARK_SIZE, center-MARK_SIZE), (center-MARK_SIZE, center+MARK_SIZE), LINE_WIDTH)
+        o_mark = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(o_mark, colors[3], (center, center), MARK_SIZE, LINE_WIDTH)
+        theme_sprites[theme_index] = (grid, {'X': x_mark.convert_alpha(), 'O': o_mark.convert_alpha()})
+    return theme_sprites[theme_index]
+
+def draw_board(board, theme_index):
+    grid, marks = get_sprites(theme_index)
+    screen.blit(grid, (0, 0))
+    for cell, player in board.history:
+        row, col = divmod(cell, GRID_SIZE)
+        screen.blit(marks[SYMBOLS[player]], (col * CELL_SIZE, row * CELL_SIZE))
     pygame.display.flip()
 
-def check_winner(board):
-    for i in range(GRID_SIZE):
-        if board[i][0] != '' and all(board[i][j] == board[i][0] for j in range(GRID_SIZE)):
-            return board[i][0]
-        if board[0][i] != '' and all(board[j][i] == board[0][i] for j in range(GRID_SIZE)):
-            return board[0][i]
-    if board[0][0] != '' and all(board[i][i] == board[0][0] for i in range(GRID_SIZE)):
-        return board[0][0]
-    if board[0][GRID_SIZE-1] != '' and all(board[i][GRID_SIZE-1-i] == board[0][GRID_SIZE-1] for i in range(GRID_SIZE)):
-        return board[0][GRID_SIZE-1]
-    return None
-
-def get_empty_cells(board):
-    return [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if board[r][c] == '']
-
-def computer_move(board, computer_symbol, player_symbol):
-    empty_cells = get_empty_cells(board)
-    for row, col in empty_cells:
-        board[row][col] = computer_symbol
-        if check_winner(board) == computer_symbol:
-            return row, col
-        board[row][col] = ''
-    for row, col in empty_cells:
-        board[row][col] = player_symbol
-        if check_winner(board) == player_symbol:
-            board[row][col] = computer_symbol
-            return row, col
-        board[row][col] = ''
-    return random.choice(empty_cells)
-
-def game_loop(mode, theme_index):
-    board = [['' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    colors = THEMES[theme_index]
-
-    player1, player2 = ('Player', 'Computer') if mode == 'PvC' else ('Player 1', 'Player 2')
-    random.shuffle(symbols)
-    symbols_map = {player1: symbols[0], player2: symbols[1]}
-    turn = player1
-
-    running = True
-    while running:
-        draw_board(board, colors)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN and (mode == 'PvP' or turn == 'Player'):
-                x, y = event.pos
-                row, col = y // CELL_SIZE, x // CELL_SIZE
-                if board[row][col] == '':
-                    board[row][col] = symbols_map[turn]
-                    draw_board(board, colors)
-                    winner_symbol = check_winner(board)
-                    if winner_symbol or not get_empty_cells(board):
-                        running = False
-                        break
-                    turn = player2 if turn == player1 else player1
-
-        if mode == 'PvC' and turn == 'Computer' and running:
-            time.sleep(1)
-            row, col = computer_move(board, symbols_map['Computer'], symbols_map['Player'])
-            board[row][col] = symbols_map['Computer']
-            draw_board(board, colors)
-            winner_symbol = check_winner(board)
-            if winner_symbol or not get_empty_cells(board):
-                running = False
-            else:
-                turn = player1
-
-    draw_board(board, colors)
-    winner_symbol = check_winner(board)
-    if winner_symbol:
-        winner = [name for name, symbol in symbols_map.items() if symbol == winner_symbol]
-        winner_text = f"{winner[0]} won the game!!"
-    else:
-        winner_text = "Match Drawn!!"
-
-    # Background rectangle for winner text
-    text_surface = font.render(winner_text, True, (255, 255, 0))
-    text_rect = text_surface.get_rect(center=(WIDTH//2, HEIGHT//2))
-    pygame.draw.rect(screen, (0, 0, 0), text_rect.inflate(20, 20))
-    screen.blit(text_surface, text_rect)
-
-    # Draw play again and menu buttons
-    button_bg = colors[4]
-    pygame.draw.rect(screen, button_bg, (WIDTH//2 - 150, HEIGHT//2 + 50, 300, 50))
-    pygame.draw.rect(screen, button_bg, (WIDTH//2 - 150, HEIGHT//2 + 110, 300, 50))
-    draw_text("Press R to Play Again", small_font, (0, 0, 0), screen, WIDTH//2, HEIGHT//2 + 75)
-    draw_text("Press M for Main Menu", small_font, (0, 0, 0), screen, WIDTH//2, HEIGHT//2 + 135)
+def post_event(event):
+    # Safe from the AI worker thread; drops the event if the game already quit.
+    if pygame.display.get_init():
+        pygame.event.post(event)
+
+def computer_move(board, computer, player, budget=THINK_TIME, opponent='classic'):
+    if opponent == 'mcts':
+        moves = board.winning_moves(computer) or board.winning_moves(player)
+        return moves[0] if moves else mcts_player.search(board, computer, budget).move
+    if solved is not None:
+        return random.choice(solved.best_moves(board, computer))
+    # Win if we can, otherwise block the opponent's win, otherwise search.
+    moves = board.winning_moves(computer) or board.winning_moves(player)
+    if moves:
+        return moves[0]
+    return searcher.search(board, computer, budget).move
+
+class PlayScene(Scene):
+    fps = None
+
+    def __init__(self, mode, theme_index, opponent='classic'):
+        self.mode = mode
+        self.theme_index = theme_index
+        self.opponent = opponent
+        self.board = Board(GRID_SIZE, WIN_LENGTH)
+
+        self.player1, self.player2 = ('Player', 'Computer') if mode == 'PvC' else ('Player 1', 'Player 2')
+        random.shuffle(symbols)
+        self.players = {self.player1: SYMBOLS.index(symbols[0]), self.player2: SYMBOLS.index(symbols[1])}
+        self.turn = self.player1
+        self.thinking = None
+        self.delay_over = False
+
+    def enter(self, manager):
+        self.start_computer()
+
+    def start_computer(self):
+        # Search on the worker thread and start the thinking delay as a timer;
+        # the move is played once both have fired, so the window never blocks.
+        if self.mode != 'PvC' or self.turn != 'Computer':
+            return
+        self.thinking = ai_worker.submit(computer_move, self.board.copy(), self.players['Computer'],
+                                         self.players['Player'], THINK_TIME * 0.9, self.opponent)
+        self.thinking.add_done_callback(lambda _: post_event(pygame.event.Event(COMPUTER_DONE, game=self)))
+        self.delay_over = False
+        pygame.time.set_timer(pygame.event.Event(COMPUTER_READY, game=self), int(THINK_TIME * 1000), 1)
+
+    def handle_event(self, event):
+        board = self.board
+        if event.type in (COMPUTER_READY, COMPUTER_DONE) and getattr(event, 'game', None) is self:
+            if event.type == COMPUTER_READY:
+                self.delay_over = True
+            if self.delay_over and self.thinking is not None and self.thinking.done():
+                cell = self.thinking.result()
+                self.thinking = None
+                return self.play(cell)
+        elif event.type == pygame.MOUSEBUTTONDOWN and (self.mode == 'PvP' or self.turn == 'Player'):
+            cell = cell_at(event.pos)
+            if cell >= 0 and board.at(*divmod(cell, GRID_SIZE)) == '':
+                return self.play(cell)
+
+    def play(self, cell):
+        self.board.play(cell, self.players[self.turn])
+        self.dirty = True
+        if self.board.is_over():
+            return ResultScene(self)
+        self.turn = self.player2 if self.turn == self.player1 else self.player1
+        self.start_computer()
+
+    def draw(self, window):
+        draw_board(self.board, self.theme_index)
+
+    def replay(self):
+        return PlayScene(self.mode, self.theme_index, self.opponent)
+
+class OnlineScene(Scene):
+    # A game against another player through the match server. Moves are only
+    # drawn once the server echoes them back, so both windows always agree.
+    fps = None
+
+    def __init__(self, theme_index, client=None):
+        self.theme_index = theme_index
+        self.client = client
+        self.board = None
+        self.status = 'Connecting...'
+
+    def enter(self, manager):
+        try:
+            if self.client is None or self.client.closed:
+                self.client = self.connect()
+            self.client.queue()
+        except OSError:
+            self.client = None
+            self.status = "Can't reach the server (M for menu)"
+            return
+        self.status = 'Waiting for an opponent...'
+
+    def connect(self):
+        # Nothing arrives before we queue, so the reader never sees ``client`` unset.
+        def on_message(message):
+            post_event(pygame.event.Event(NET_MESSAGE, client=client, message=message))
+        client = MatchClient(*server_address, on_message)
+        return client
+
+    def handle_event(self, event):
+        if event.type == NET_MESSAGE and event.client is self.client:
+            return self.receive(event.message)
+        if event.type == pygame.MOUSEBUTTONDOWN and self.board is not None and self.turn == self.me:
+            cell = cell_at(event.pos)
+            if cell >= 0 and self.board.at(*divmod(cell, GRID_SIZE)) == '':
+                self.client.move(cell)
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_m, pygame.K_ESCAPE):
+            self.leave()
+            return MainMenuScene()
+
+    def receive(self, message):
+        self.dirty = True
+        if message is None:
+            self.client = None
+            if self.board is not None:
+                return ResultScene(self, "Connection lost")
+            self.status = 'Disconnected (M for menu)'
+            return
+        kind = message[0]
+        if kind == MSG_MATCHED:
+            _, self.me, self.turn, size, k = MATCHED.unpack(message)
+            if (size, k) != (GRID_SIZE, WIN_LENGTH):
+                self.leave()
+                self.status = f'Server plays {size}x{size} (M for menu)'
+                return
+            self.board = Board(size, k)
+            self.players = {'You': self.me, 'Opponent': 1 - self.me}
+        elif kind == MSG_MOVED:
+            _, player, cell = MOVED.unpack(message)
+            self.board.play(cell, player)
+            self.turn = 1 - player
+        elif kind == MSG_OVER:
+            result = message[1]
+            if result == OPPONENT_LEFT:
+                return ResultScene(self, "Opponent left the game")
+            return ResultScene(self, "Match Drawn!!" if result == DRAW else None)
+
+    def draw(self, window):
+        if self.board is not None:
+            draw_board(self.board, self.theme_index)
+            return
+        screen.fill((0, 0, 0))
+        draw_text(self.status, small_font, (255, 255, 255), screen, WIDTH//2, HEIGHT//2)
+        pygame.display.flip()
 
-    pygame.display.flip()
-    wait_for_choice(mode, theme_index)
-
-def wait_for_choice(mode, theme_index):
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    game_loop(mode, theme_index)
-                    return
-                elif event.key == pygame.K_m:
-                    main()
-                    return
+    def replay(self):
+        return OnlineScene(self.theme_index, self.client)
+
+    def leave(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+class ResultScene(Scene):
+    fps = None
+
+    def __init__(self, play, text=None):
+        self.play = play
+        self.theme_index = play.theme_index
+        self.board = play.board
+        if text is not None:
+            self.winner_text = text
+        elif self.board.winner is not None:
+            winner = [name for name, player in play.players.items() if player == self.board.winner]
+            self.winner_text = f"{winner[0]} won the game!!"
+        else:
+            self.winner_text = "Match Drawn!!"
+
+    def draw(self, window):
+        colors = THEMES[self.theme_index]
+        draw_board(self.board, self.theme_index)
+
+        # Background rectangle for winner text
+        text_surface = render_text(font, self.winner_text, (255, 255, 0))
+        text_rect = text_surface.get_rect(center=(WIDTH//2, HEIGHT//2))
+        pygame.draw.rect(screen, (0, 0, 0), text_rect.inflate(20, 20))
+        screen.blit(text_surface, text_rect)
+
+        # Draw play again and menu buttons
+        button_bg = colors[4]
+        pygame.draw.rect(screen, button_bg, (WIDTH//2 - 150, HEIGHT//2 + 50, 300, 50))
+        pygame.draw.rect(screen, button_bg, (WIDTH//2 - 150, HEIGHT//2 + 110, 300, 50))
+        draw_text("Press R to Play Again", small_font, (0, 0, 0), screen, WIDTH//2, HEIGHT//2 + 75)
+        draw_text("Press M for Main Menu", small_font, (0, 0, 0), screen, WIDTH//2, HEIGHT//2 + 135)
+
+        pygame.display.flip()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:
+                return self.play.replay()
+            elif event.key == pygame.K_m:
+                self.play.leave()
+                return MainMenuScene()
 
 def main():
-    global mode, current_theme
-    while True:
-        mode = main_menu()
-        current_theme = choose_theme()
-        game_loop(mode, current_theme)
+    global server_address
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe")
+    parser.add_argument("--server", default=f"{server_address[0]}:{server_address[1]}",
+                        help="match server for online play, as host:port")
+    args = parser.parse_args()
+    host, _, port = args.server.rpartition(':')
+    server_address = (host or server_address[0], int(port))
+
+    SceneManager(screen, MainMenuScene()).run()
+    mcts_player.close()
+    pygame.quit()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from match_server import (
+    DEFAULT_PORT, MATCHED, MOVE, MOVED, MSG_MATCHED, MSG_MOVE, MSG_MOVED, MSG_OVER,
+    MSG_QUEUE, MSG_REJECT, QUEUE, SERVER_SIZES, split_messages,
+)
+
+
+class BotProtocol(asyncio.Protocol):
+    # Loopback load-test client: queues for a match, plays random legal moves
+    # (after an optional think time), queues again when the game ends, and
+    # times each move from sending it to receiving the server's echo.
+    def __init__(self, stats, rng, think):
+        self.stats = stats
+        self.rng = rng
+        self.think = think
+        self.buffer = bytearray()
+        self.transport = None
+        self.me = 0
+        self.turn = 0
+        self.cells = 0
+        self.occupied = 0
+        self.game = 0
+        self.sent_at = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(QUEUE.pack(MSG_QUEUE))
+
+    def data_received(self, data):
+        self.buffer += data
+        for message in split_messages(self.buffer, SERVER_SIZES):
+            kind = message[0]
+            if kind == MSG_MATCHED:
+                _, self.me, self.turn, size, _ = MATCHED.unpack(message)
+                self.cells = size * size
+                self.occupied = 0
+                self.game += 1
+                self.stats["matches"] += 1
+                self.stats["in_match"] += 1
+                self.schedule()
+            elif kind == MSG_MOVED:
+                _, player, cell = MOVED.unpack(message)
+                self.occupied |= 1 << cell
+                self.turn = 1 - player
+                if player == self.me and self.sent_at is not None:
+                    self.stats["moves"] += 1
+                    self.stats["latencies"].append(time.perf_counter() - self.sent_at)
+                    self.sent_at = None
+                self.schedule()
+            elif kind == MSG_OVER:
+                self.stats["in_match"] -= 1
+                self.stats["games"] += 1
+                self.turn = -1
+                self.transport.write(QUEUE.pack(MSG_QUEUE))
+            elif kind == MSG_REJECT:
+                self.stats["rejects"] += 1
+
+    def schedule(self):
+        if self.turn != self.me or self.occupied == (1 << self.cells) - 1:
+            return
+        # Never reply inline: a game-over message may follow in the same read.
+        loop = asyncio.get_running_loop()
+        if self.think:
+            loop.call_later(self.rng.uniform(0.5, 1.5) * self.think, self.play, self.game)
+        else:
+            loop.call_soon(self.play, self.game)
+
+    def play(self, game):
+        if game != self.game or self.turn != self.me or self.transport.is_closing():
+            return
+        empty = [cell for cell in range(self.cells) if not self.occupied >> cell & 1]
+        if empty:
+            self.sent_at = time.perf_counter()
+            self.transport.write(MOVE.pack(MSG_MOVE, self.rng.choice(empty)))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def run_bots(host, port, count, duration, think, seed):
+    loop = asyncio.get_running_loop()
+    stats = {"matches": 0, "in_match": 0, "games": 0, "moves": 0, "rejects": 0, "latencies": []}
+    rng = random.Random(seed)
+    bots = []
+    connect_start = time.perf_counter()
+    for start in range(0, count, 500):
+        batch = [loop.create_connection(lambda: BotProtocol(stats, random.Random(rng.random()), think), host, port)
+                 for _ in range(min(500, count - start))]
+        bots.extend(bot for _, bot in await asyncio.gather(*batch))
+    print(f"{count} bots connected in {time.perf_counter() - connect_start:.1f}s", flush=True)
+
+    await asyncio.sleep(min(2.0, duration))  # let matchmaking settle
+    for key in ("games", "moves", "rejects"):
+        stats[key] = 0
+    stats["latencies"].clear()
+    start = time.perf_counter()
+    peak = 0
+    while time.perf_counter() - start < duration:
+        await asyncio.sleep(0.25)
+        peak = max(peak, stats["in_match"] // 2)
+    elapsed = time.perf_counter() - start
+
+    latencies = stats["latencies"]
+    print(f"{count} bots for {elapsed:.1f}s: {stats['moves'] / elapsed:,.0f} moves/s, "
+          f"{stats['games'] / 2 / elapsed:,.0f} games/s, up to {peak:,} concurrent matches, "
+          f"{stats['rejects']} rejected moves")
+    print(f"move latency p50 {1000 * percentile(latencies, 0.5):.2f} ms, "
+          f"p99 {1000 * percentile(latencies, 0.99):.2f} ms, max {1000 * max(latencies, default=0):.2f} ms")
+    for bot in bots:
+        bot.transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback bot clients for the tic-tac-toe match server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bots", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds a bot waits before moving")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-server", action="store_true", help="start match_server.py as a subprocess")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "match_server.py")
+        server = subprocess.Popen([sys.executable, script, "--host", args.host, "--port", str(args.port)])
+        time.sleep(1.0)
+    try:
+        asyncio.run(run_bots(args.host, args.port, args.bots, args.duration, args.think, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
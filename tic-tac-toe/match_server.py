@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from bitboard import Board
+
+# --- Protocol ---
+# Fixed-size binary messages, told apart by their first byte.
+# Client -> server:
+#   QUEUE  type                       join matchmaking (again after a game ends)
+#   MOVE   type, u16 cell             play a cell; the server echoes it as MOVED
+# Server -> client:
+#   MATCHED type, you, first, size, k  players are 0/1; ``first`` moves first
+#   MOVED   type, player, u16 cell     a validated move, sent to both players
+#   OVER    type, result               0/1 winner, DRAW, or OPPONENT_LEFT
+#   REJECT  type, reason               the last message was not accepted
+MSG_QUEUE, MSG_MOVE = 1, 2
+MSG_MATCHED, MSG_MOVED, MSG_OVER, MSG_REJECT = 3, 4, 5, 6
+DRAW, OPPONENT_LEFT = 2, 3
+NOT_IN_MATCH, NOT_YOUR_TURN, BAD_CELL, ALREADY_QUEUED = 1, 2, 3, 4
+
+QUEUE = struct.Struct("<B")
+MOVE = struct.Struct("<BH")
+MATCHED = struct.Struct("<BBBBB")
+MOVED = struct.Struct("<BBH")
+OVER = struct.Struct("<BB")
+REJECT = struct.Struct("<BB")
+CLIENT_SIZES = {MSG_QUEUE: QUEUE.size, MSG_MOVE: MOVE.size}
+SERVER_SIZES = {MSG_MATCHED: MATCHED.size, MSG_MOVED: MOVED.size, MSG_OVER: OVER.size, MSG_REJECT: REJECT.size}
+
+DEFAULT_PORT = 8766
+
+
+def split_messages(buffer, sizes):
+    # Pop every complete message off the front of ``buffer``; raises ValueError
+    # on an unknown message type.
+    messages = []
+    pos = 0
+    while pos < len(buffer):
+        size = sizes.get(buffer[pos])
+        if size is None:
+            raise ValueError(f"unknown message type {buffer[pos]}")
+        if len(buffer) - pos < size:
+            break
+        messages.append(bytes(buffer[pos:pos + size]))
+        pos += size
+    del buffer[:pos]
+    return messages
+
+
+class Match:
+    # Everything a live game needs: two bitboards, whose turn it is and the two
+    # connections. Win lines come from the server's shared Board.
+    __slots__ = ("players", "bits", "turn")
+
+    def __init__(self, first, second, turn):
+        self.players = (first, second)
+        self.bits = [0, 0]
+        self.turn = turn
+
+
+class MatchServer:
+    def __init__(self, size=3, k=None, stats_every=5.0):
+        self.board = Board(size, k)  # geometry only: lines through each cell
+        self.queue = deque()
+        self.matches = 0
+        self.moves = 0
+        self.finished = 0
+        self.stats_every = stats_every
+
+    def enqueue(self, client):
+        if client.match is not None or client.queued:
+            client.send(REJECT.pack(MSG_REJECT, ALREADY_QUEUED))
+            return
+        while self.queue:
+            other = self.queue.popleft()
+            if other.transport.is_closing() or not other.queued:
+                continue
+            other.queued = False
+            turn = self.matches & 1  # alternate who starts
+            match = Match(other, client, turn)
+            other.match, other.player = match, 0
+            client.match, client.player = match, 1
+            self.matches += 1
+            size, k = self.board.size, self.board.k
+            other.send(MATCHED.pack(MSG_MATCHED, 0, turn, size, k))
+            client.send(MATCHED.pack(MSG_MATCHED, 1, turn, size, k))
+            return
+        client.queued = True
+        self.queue.append(client)
+
+    def move(self, client, cell):
+        match = client.match
+        if match is None:
+            client.send(REJECT.pack(MSG_REJECT, NOT_IN_MATCH))
+            return
+        player = client.player
+        if match.turn != player:
+            client.send(REJECT.pack(MSG_REJECT, NOT_YOUR_TURN))
+            return
+        bit = 1 << cell
+        if cell >= self.board.cells or (match.bits[0] | match.bits[1]) & bit:
+            client.send(REJECT.pack(MSG_REJECT, BAD_CELL))
+            return
+
+        stones = match.bits[player] | bit
+        match.bits[player] = stones
+        match.turn = 1 - player
+        self.moves += 1
+        moved = MOVED.pack(MSG_MOVED, player, cell)
+        for other in match.players:
+            other.send(moved)
+
+        result = None
+        for mask in self.board.lines_through[cell]:
+            if stones & mask == mask:
+                result = player
+                break
+        else:
+            if match.bits[0] | match.bits[1] == self.board.full:
+                result = DRAW
+        if result is not None:
+            self.end(match, result)
+
+    def end(self, match, result):
+        over = OVER.pack(MSG_OVER, result)
+        for other in match.players:
+            other.match = None
+            other.send(over)
+        self.matches -= 1
+        self.finished += 1
+
+    def leave(self, client):
+        client.queued = False
+        if client.match is not None:
+            self.end(client.match, OPPONENT_LEFT)
+
+    async def report(self, connections):
+        last_moves, last_time = 0, time.perf_counter()
+        while True:
+            await asyncio.sleep(self.stats_every)
+            now = time.perf_counter()
+            rate = (self.moves - last_moves) / (now - last_time)
+            print(f"{len(connections)} connections, {self.matches} live matches, {len(self.queue)} queued, "
+                  f"{self.finished} finished, {rate:,.0f} moves/s", flush=True)
+            last_moves, last_time = self.moves, now
+
+
+class MatchProtocol(asyncio.Protocol):
+    __slots__ = ("server", "connections", "transport", "buffer", "match", "player", "queued")
+
+    def __init__(self, server, connections):
+        self.server = server
+        self.connections = connections
+        self.transport = None
+        self.buffer = bytearray()
+        self.match = None
+        self.player = 0
+        self.queued = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.connections.add(self)
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, data):
+        if not self.transport.is_closing():
+            self.transport.write(data)
+
+    def data_received(self, data):
+        self.buffer += data
+        try:
+            messages = split_messages(self.buffer, CLIENT_SIZES)
+        except ValueError:
+            self.transport.close()
+            return
+        for message in messages:
+            if message[0] == MSG_QUEUE:
+                self.server.enqueue(self)
+            else:
+                self.server.move(self, MOVE.unpack(message)[1])
+
+    def connection_lost(self, exc):
+        self.connections.discard(self)
+        self.server.leave(self)
+
+
+async def serve(host, port, size, k, stats_every=5.0):
+    server = MatchServer(size, k, stats_every)
+    connections = set()
+    loop = asyncio.get_running_loop()
+    listener = await loop.create_server(lambda: MatchProtocol(server, connections), host, port, backlog=4096)
+    print(f"tic-tac-toe {size}x{size} matches on {host}:{port}", flush=True)
+    async with listener:
+        await server.report(connections)
+
+
+# --- Client ---
+
+class MatchClient:
+    """Blocking client for the game window.
+
+    A reader thread hands each server message to ``on_message`` (as raw bytes)
+    and calls it with None when the connection drops, so the caller can turn
+    them into events for its own loop.
+    """
+
+    def __init__(self, host, port, on_message, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.on_message = on_message
+        self.closed = False
+        self.reader = threading.Thread(target=self.read, daemon=True)
+        self.reader.start()
+
+    def read(self):
+        buffer = bytearray()
+        try:
+            while True:
+                data = self.sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                for message in split_messages(buffer, SERVER_SIZES):
+                    self.on_message(message)
+        except (OSError, ValueError):
+            pass
+        self.closed = True
+        self.on_message(None)
+
+    def queue(self):
+        self.sock.sendall(QUEUE.pack(MSG_QUEUE))
+
+    def move(self, cell):
+        self.sock.sendall(MOVE.pack(MSG_MOVE, cell))
+
+    def close(self):
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matchmaking server for networked tic-tac-toe")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--k", type=int, help="marks in a row to win (default: board size)")
+    parser.add_argument("--stats-every", type=float, default=5.0, help="seconds between stats lines")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.size, args.k or args.size, args.stats_every))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
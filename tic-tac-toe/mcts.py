@@ -0,0 +1,273 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import Board, near_masks
+
+EXPLORATION = 1.4
+
+MCTSResult = namedtuple("MCTSResult", "move playouts elapsed reused")
+
+
+class Node:
+    # ``player`` made ``move`` to reach this node; ``score`` counts that
+    # player's wins (draws count half) over ``visits`` playouts through it.
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "score", "winner")
+
+    def __init__(self, move=-1, player=1, parent=None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.score = 0.0
+        self.winner = None
+
+
+# --- Rollouts (run in the worker processes) ---
+
+_board = None
+
+
+def _init_worker(size, k):
+    global _board
+    _board = Board(size, k)
+
+
+def rollout(board, bits, player, rng):
+    """Play random moves from ``bits`` with ``player`` to move; return the winner or None."""
+    stones = list(bits)
+    occupied = stones[0] | stones[1]
+    cells = [cell for cell in range(board.cells) if not occupied >> cell & 1]
+    rng.shuffle(cells)
+    lines_through = board.lines_through
+    for cell in cells:
+        mine = stones[player] | 1 << cell
+        stones[player] = mine
+        for mask in lines_through[cell]:
+            if mine & mask == mask:
+                return player
+        player = 1 - player
+    return None
+
+
+def _rollouts(leaves, count, seed):
+    # [wins for player 0, wins for player 1] after ``count`` rollouts per leaf.
+    rng = random.Random(seed)
+    results = []
+    for bits, player in leaves:
+        wins = [0, 0]
+        for _ in range(count):
+            winner = rollout(_board, bits, player, rng)
+            if winner is not None:
+                wins[winner] += 1
+        results.append(wins)
+    return results
+
+
+# --- Tree ---
+
+class MCTSPlayer:
+    """Monte Carlo tree search with leaf-parallel random playouts.
+
+    Each round selects a batch of leaves by UCT, marking the visits up front
+    (virtual loss) so the batch spreads out, and hands them to a process pool;
+    every leaf gets ``rollouts_per_leaf`` playouts. The tree is kept between
+    moves: the next search starts from the subtree of the moves actually
+    played. On boards over 5x5 only cells next to a stone are expanded.
+    """
+
+    def __init__(self, size, k=None, workers=None, leaves_per_worker=4, rollouts_per_leaf=8, seed=None):
+        self.board = Board(size, k)
+        self.size = size
+        self.k = self.board.k
+        self.workers = workers or os.cpu_count() or 1
+        self.leaves_per_worker = leaves_per_worker
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.rng = random.Random(seed)
+        self.near = near_masks(size, 1) if self.board.cells > 25 else None
+        self.pool = None
+        self.root = None
+        self.history = []
+
+    def start(self):
+        """Fork the rollout workers; call it before the program starts threads or SDL.
+
+        Forking copies only the calling thread, so workers forked later could
+        inherit locks held by threads that no longer exist; every worker is
+        forked here rather than on the first search. Without fork (other start
+        methods re-run the game module in every worker), or with fewer cores
+        than workers, where the pool is slower than one process, rollouts stay
+        in-process.
+        """
+        if (self.pool is None and 1 < self.workers <= (os.cpu_count() or 1)
+                and "fork" in multiprocessing.get_all_start_methods()):
+            context = multiprocessing.get_context("fork")
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(self.size, self.k))
+            self.pool.submit(_rollouts, [], 0, 0).result()  # a fork pool starts all its workers on the first task
+        if self.pool is None:
+            _init_worker(self.size, self.k)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def reuse(self, board):
+        # Walk the kept tree along the moves played since the last search.
+        history = board.history
+        node = self.root
+        if node is None or history[:len(self.history)] != self.history:
+            return None
+        for cell, player in history[len(self.history):]:
+            node = next((child for child in node.children if child.move == cell and child.player == player), None)
+            if node is None:
+                return None
+        node.parent = None
+        return node
+
+    def expand_moves(self, board):
+        if not (board.bits[0] | board.bits[1]):
+            return [board.cells // 2]
+        bits = board.near(self.near) if self.near is not None else 0
+        if not bits:
+            return board.empty_cells()
+        moves = []
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            moves.append(low.bit_length() - 1)
+        return moves
+
+    def select(self, root, board, count):
+        # Descend by UCT from the root, expanding one untried move; returns the
+        # leaf and the position after it, with ``count`` visits already added.
+        node, depth = root, len(board.history)
+        node.visits += count
+        while node.winner is None and not board.is_full():
+            if node.untried is None:
+                node.untried = self.expand_moves(board)
+                self.rng.shuffle(node.untried)
+            if node.untried:
+                cell = node.untried.pop()
+                player = 1 - node.player
+                child = Node(cell, player, node)
+                node.children.append(child)
+                if board.play(cell, player) is not None:
+                    child.winner = player
+                child.visits += count
+                node = child
+                break
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda c: c.score / c.visits + EXPLORATION * math.sqrt(log_visits / c.visits))
+            board.play(node.move, node.player)
+            node.visits += count
+        leaf = (tuple(board.bits), 1 - node.player)
+        while len(board.history) > depth:
+            board.undo()
+        return node, leaf
+
+    def backup(self, node, wins, count):
+        draws = count - wins[0] - wins[1]
+        while node is not None:
+            node.score += wins[node.player] + 0.5 * draws
+            node = node.parent
+
+    def search(self, board, player, budget=1.0):
+        """Best move for ``player`` after ``budget`` seconds of playouts."""
+        start = time.perf_counter()
+        self.start()
+        root = self.reuse(board)
+        reused = root.visits if root is not None else 0
+        if root is None:
+            root = Node(player=1 - player)
+        self.root = root
+        board = board.copy()
+        count = self.rollouts_per_leaf
+        batch = self.leaves_per_worker * max(1, self.workers)
+        playouts = 0
+        while True:
+            selected, leaves = [], []
+            for _ in range(batch):
+                node, leaf = self.select(root, board, count)
+                if node.winner is not None or not board.full & ~(leaf[0][0] | leaf[0][1]):
+                    wins = [0, 0]
+                    if node.winner is not None:
+                        wins[node.winner] = count
+                    self.backup(node, wins, count)
+                else:
+                    selected.append(node)
+                    leaves.append(leaf)
+            if self.pool is not None:
+                chunks = [leaves[i::self.workers] for i in range(self.workers)]
+                futures = [self.pool.submit(_rollouts, chunk, count, self.rng.getrandbits(32))
+                           for chunk in chunks if chunk]
+                results = [None] * len(leaves)
+                for i, future in enumerate(futures):
+                    results[i::self.workers] = future.result()
+            else:
+                results = _rollouts(leaves, count, self.rng.getrandbits(32))
+            for node, wins in zip(selected, results):
+                self.backup(node, wins, count)
+            playouts += count * batch
+            if time.perf_counter() - start >= budget or len(root.children) == 1 and not root.untried:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        self.root = best
+        best.parent = None
+        self.history = board.history + [(best.move, player)]
+        return MCTSResult(best.move, playouts, time.perf_counter() - start, reused)
+
+
+# --- Benchmark ---
+
+def opening(size, k, moves, seed=0):
+    board = Board(size, k)
+    rng = random.Random(seed)
+    centre = size // 2
+    player = 0
+    while len(board.history) < moves:
+        row, col = centre + rng.randint(-2, 2), centre + rng.randint(-2, 2)
+        if board.at(row, col) == '':
+            board.play(row * size + col, player)
+            player = 1 - player
+    return board, player
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MCTS playouts/s against the number of worker processes")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--seconds", type=float, default=3.0, help="search time per measurement")
+    parser.add_argument("--opening", type=int, default=6, help="stones placed before searching")
+    args = parser.parse_args()
+
+    board, player = opening(args.size, args.k, args.opening)
+    print(f"{args.size}x{args.size}, {args.k} in a row, {args.opening} stones placed, "
+          f"{os.cpu_count()} CPUs")
+    baseline = None
+    for workers in args.workers:
+        mcts = MCTSPlayer(args.size, args.k, workers=workers, seed=0)
+        mcts.start()
+        mcts.search(board, player, 0.2)  # warm up the pool
+        mcts.root = None
+        result = mcts.search(board, player, args.seconds)
+        mcts.close()
+        rate = result.playouts / result.elapsed
+        baseline = baseline or rate
+        print(f"{workers:3d} workers: {rate:10,.0f} playouts/s  x{rate / baseline:.2f}  "
+              f"move {divmod(result.move, args.size)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from bitboard import Board, near_masks
+
+WIN_SCORE = 1 << 20
+EXACT, LOWER, UPPER = 0, 1, 2
+
+SearchResult = namedtuple("SearchResult", "move score depth nodes elapsed tt_hit_rate")
+
+
+class Timeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    # A fixed number of slots (a power of two) in parallel lists, indexed by the
+    # low bits of the Zobrist key, so memory never grows past the first search.
+    # An entry is replaced when it is from an earlier search or when the new
+    # result is searched at least as deep.
+    def __init__(self, bits=18):
+        size = 1 << bits
+        self.mask = size - 1
+        self.keys = [0] * size
+        self.depths = [-1] * size
+        self.values = [0] * size
+        self.flags = [EXACT] * size
+        self.moves = [-1] * size
+        self.ages = [0] * size
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key):
+        self.probes += 1
+        slot = key & self.mask
+        if self.keys[slot] != key or self.depths[slot] < 0:
+            return None
+        self.hits += 1
+        return slot
+
+    def store(self, key, depth, value, flag, move):
+        slot = key & self.mask
+        if self.ages[slot] == self.age and self.depths[slot] > depth and self.keys[slot] != key:
+            return
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.values[slot] = value
+        self.flags[slot] = flag
+        self.moves[slot] = move
+        self.ages[slot] = self.age
+
+
+class Searcher:
+    """Negamax with alpha-beta, a transposition table and iterative deepening.
+
+    ``search(board, player, budget)`` deepens one ply at a time until the budget
+    runs out and returns the best move of the last finished iteration. Leaves are
+    scored by open lines (no opposing stone) weighted by how full they are; that
+    score and the Zobrist key are both updated per move rather than recomputed.
+
+    On boards over 5x5 only cells next to an existing stone are searched.
+    """
+
+    def __init__(self, size, k=None, tt_bits=18, seed=0):
+        self.board = Board(size, k)
+        self.size = size
+        self.k = self.board.k
+        cells = self.board.cells
+        rng = random.Random(seed)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(cells)] for _ in range(2)]
+        self.side_key = rng.getrandbits(64)
+        self.tt = TranspositionTable(tt_bits)
+        # Weight of an open line holding m of one player's stones.
+        self.weights = [0] + [4 ** m for m in range(self.k - 1)] + [0]
+
+        self.near = near_masks(size, 1 if cells > 25 else size)
+        self.nodes = 0
+        self.deadline = 0.0
+
+    # --- Position ---
+
+    def load(self, board):
+        self.bits = [0, 0]
+        self.key = 0
+        self.score = 0  # from player 0's point of view
+        for cell, player in board.history:
+            self.make(cell, player)
+
+    def delta(self, cell, player):
+        # Change in ``player``'s open-line score from playing ``cell``.
+        mine, theirs = self.bits[player], self.bits[1 - player]
+        weights = self.weights
+        delta = 0
+        for mask in self.board.lines_through[cell]:
+            if not theirs & mask:
+                m = (mine & mask).bit_count()
+                delta += weights[m + 1] - weights[m]
+            elif not mine & mask:
+                delta += weights[(theirs & mask).bit_count()]
+        return delta
+
+    def make(self, cell, player):
+        delta = self.delta(cell, player)
+        self.score += delta if player == 0 else -delta
+        self.bits[player] |= 1 << cell
+        self.key ^= self.zobrist[player][cell]
+        return delta
+
+    def unmake(self, cell, player, delta):
+        self.bits[player] ^= 1 << cell
+        self.key ^= self.zobrist[player][cell]
+        self.score -= delta if player == 0 else -delta
+
+    def wins(self, cell, player):
+        stones = self.bits[player] | 1 << cell
+        for mask in self.board.lines_through[cell]:
+            if stones & mask == mask:
+                return True
+        return False
+
+    def candidates(self, player, first=-1, ordered=True):
+        occupied = self.bits[0] | self.bits[1]
+        empty = self.board.full & ~occupied
+        if not occupied:
+            return [self.board.cells // 2]
+        if self.near[0] != self.board.full:
+            area, bits = 0, occupied
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                area |= self.near[low.bit_length() - 1]
+            empty &= area
+        moves = []
+        while empty:
+            low = empty & -empty
+            empty ^= low
+            moves.append(low.bit_length() - 1)
+        if ordered:
+            moves.sort(key=lambda cell: -self.delta(cell, player) - self.delta(cell, 1 - player))
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    # --- Search ---
+
+    def negamax(self, depth, alpha, beta, player, ply):
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise Timeout
+
+        tt = self.tt
+        key = self.key ^ (self.side_key if player else 0)
+        alpha_start = alpha
+        first = -1
+        slot = tt.probe(key)
+        if slot is not None:
+            first = tt.moves[slot]
+            if tt.depths[slot] >= depth:
+                value = tt.values[slot]
+                # Win scores are stored relative to this node, not the root.
+                if value > WIN_SCORE // 2:
+                    value -= ply
+                elif value < -WIN_SCORE // 2:
+                    value += ply
+                # Bounds only cut off; narrowing the window with them would
+                # make the flag stored below describe a window never searched.
+                flag = tt.flags[slot]
+                if (flag == EXACT or flag == LOWER and value >= beta
+                        or flag == UPPER and value <= alpha):
+                    return value
+
+        if self.bits[0] | self.bits[1] == self.board.full:
+            return 0
+        static = self.score if player == 0 else -self.score
+        if depth == 0:
+            return static
+
+        # One ply from the horizon a child's score is just this move's delta, so
+        # it isn't worth ordering the moves or making them.
+        moves = self.candidates(player, first, ordered=depth > 1)
+        best, best_move = -WIN_SCORE - 1, moves[0]
+        for cell in moves:
+            if self.wins(cell, player):
+                value = WIN_SCORE - ply - 1
+            elif depth == 1:
+                self.nodes += 1
+                value = static + self.delta(cell, player)
+            else:
+                delta = self.make(cell, player)
+                try:
+                    value = -self.negamax(depth - 1, -beta, -alpha, 1 - player, ply + 1)
+                finally:
+                    self.unmake(cell, player, delta)
+            if value > best:
+                best, best_move = value, cell
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        stored = best
+        if stored > WIN_SCORE // 2:
+            stored += ply
+        elif stored < -WIN_SCORE // 2:
+            stored -= ply
+        flag = UPPER if best <= alpha_start else LOWER if best >= beta else EXACT
+        tt.store(key, depth, stored, flag, best_move)
+        return best
+
+    def search(self, board, player, budget=1.0, max_depth=None):
+        """Best move for ``player`` found within ``budget`` seconds."""
+        start = time.perf_counter()
+        self.deadline = start + budget
+        self.nodes = 0
+        tt = self.tt
+        tt.age += 1
+        tt.probes = tt.hits = 0
+        self.load(board)
+
+        empty = len(board.empty_cells())
+        max_depth = min(max_depth or empty, empty)
+        move, score, reached = self.candidates(player)[0], 0, 0
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self.negamax(depth, -WIN_SCORE - 1, WIN_SCORE + 1, player, 0)
+            except Timeout:
+                break
+            slot = tt.probe(self.key ^ (self.side_key if player else 0))
+            if slot is not None and tt.moves[slot] >= 0:
+                move = tt.moves[slot]
+            reached = depth
+            if abs(score) > WIN_SCORE // 2:
+                break  # forced result found; deeper search can't change it
+        elapsed = time.perf_counter() - start
+        hit_rate = tt.hits / tt.probes if tt.probes else 0.0
+        return SearchResult(move, score, reached, self.nodes, elapsed, hit_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Let the alpha-beta searcher play itself and report its speed")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per move")
+    parser.add_argument("--moves", type=int, default=10)
+    parser.add_argument("--tt-bits", type=int, default=18, help="log2 of transposition table slots")
+    args = parser.parse_args()
+
+    board = Board(args.size, args.k)
+    searcher = Searcher(args.size, args.k, args.tt_bits)
+    player = 0
+    for _ in range(args.moves):
+        if board.is_over():
+            break
+        result = searcher.search(board, player, args.budget)
+        board.play(result.move, player)
+        print(f"{'XO'[player]} {divmod(result.move, args.size)}: depth {result.depth}, score {result.score}, "
+              f"{result.nodes / max(result.elapsed, 1e-9):,.0f} nodes/s, TT hits {result.tt_hit_rate:.0%}")
+        player = 1 - player
+    if board.winner is not None:
+        print(f"{'XO'[board.winner]} wins")
+
+
+if __name__ == "__main__":
+    main()
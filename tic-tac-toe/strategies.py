@@ -0,0 +1,58 @@
+import random
+
+import tablebase
+from mcts import MCTSPlayer
+from search import Searcher
+
+
+def random_move(board, computer, player, rng=random):
+    return rng.choice(board.empty_cells())
+
+
+def heuristic_move(board, computer, player, rng=random):
+    # Win if we can, otherwise block the opponent's win, otherwise play anywhere.
+    moves = board.winning_moves(computer) or board.winning_moves(player)
+    return moves[0] if moves else rng.choice(board.empty_cells())
+
+
+# --- Registry ---
+# name -> factory(size, k, budget, rng) returning move(board, computer, player).
+
+def _random(size, k, budget, rng):
+    return lambda board, computer, player: random_move(board, computer, player, rng)
+
+
+def _heuristic(size, k, budget, rng):
+    return lambda board, computer, player: heuristic_move(board, computer, player, rng)
+
+
+def _tablebase(size, k, budget, rng):
+    solved = tablebase.load(size, k, generate_missing=size <= 3)
+    if solved is None:
+        raise ValueError(f"no tablebase for {size}x{size}, {k} in a row; run tablebase.py first")
+    return lambda board, computer, player: rng.choice(solved.best_moves(board, computer))
+
+
+def _search(size, k, budget, rng):
+    searcher = Searcher(size, k, seed=rng.getrandbits(32))
+    return lambda board, computer, player: searcher.search(board, computer, budget).move
+
+
+def _mcts(size, k, budget, rng):
+    mcts = MCTSPlayer(size, k, workers=1, seed=rng.getrandbits(32))
+    return lambda board, computer, player: mcts.search(board, computer, budget).move
+
+
+STRATEGIES = {
+    "random": _random,
+    "heuristic": _heuristic,
+    "tablebase": _tablebase,
+    "search": _search,
+    "mcts": _mcts,
+}
+
+
+def make(name, size, k, budget=0.05, rng=None):
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r} (choose from {', '.join(STRATEGIES)})")
+    return STRATEGIES[name](size, k, budget, rng or random.Random())
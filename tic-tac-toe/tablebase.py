@@ -0,0 +1,242 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+from bitboard import Board
+
+# --- Format ---
+# Header: magic, version, board size, line length. Body: a 2-bit value for every
+# base-3 position index (4 per byte, lowest bits first). Positions are stored from
+# the point of view of the side to move (digit 1 = its stones, 2 = the opponent's)
+# and only under their canonical index, the smallest of the 8 symmetric ones.
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBB")
+EXTENSION = ".ttb"
+
+UNKNOWN, LOSS, DRAW, WIN = 0, 1, 2, 3
+
+
+def default_path(size, k):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets",
+                        f"tablebase_{size}x{size}_{k}{EXTENSION}")
+
+
+def symmetries(size):
+    # The 8 rotations/reflections of the board as cell -> cell maps.
+    def cell(row, col):
+        return row * size + col
+
+    last = size - 1
+    transforms = (
+        lambda r, c: (r, c), lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c), lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c), lambda r, c: (last - r, c),
+        lambda r, c: (c, r), lambda r, c: (last - c, last - r),
+    )
+    return [[cell(*t(row, col)) for row in range(size) for col in range(size)] for t in transforms]
+
+
+class PositionIndex:
+    # Canonical base-3 index of a (mine, theirs) bitboard pair. Each row's two
+    # n-bit slices form a key into a per-symmetry, per-row table of base-3
+    # contributions, so an index is n lookups per symmetry rather than a loop
+    # over every cell.
+    def __init__(self, size):
+        self.size = size
+        self.row_mask = (1 << size) - 1
+        self.tables = []
+        for perm in symmetries(size):
+            rows = []
+            for row in range(size):
+                table = [0] * (1 << 2 * size)
+                for key in range(1 << 2 * size):
+                    mine, theirs = key & self.row_mask, key >> size
+                    if mine & theirs:
+                        continue
+                    total = 0
+                    for col in range(size):
+                        target = 3 ** perm[row * size + col]
+                        if mine >> col & 1:
+                            total += target
+                        elif theirs >> col & 1:
+                            total += 2 * target
+                    table[key] = total
+                rows.append(table)
+            self.tables.append(rows)
+
+    def __call__(self, mine, theirs):
+        size, mask = self.size, self.row_mask
+        keys = []
+        for row in range(size):
+            shift = row * size
+            keys.append((mine >> shift & mask) | (theirs >> shift & mask) << size)
+        best = None
+        for rows in self.tables:
+            total = 0
+            for table, key in zip(rows, keys):
+                total += table[key]
+            if best is None or total < best:
+                best = total
+        return best
+
+
+# --- Generator ---
+
+def solve(size, k):
+    """Value of every reachable position for the side to move, as a bytearray."""
+    board = Board(size, k)
+    index = PositionIndex(size)
+    values = bytearray(3 ** board.cells)
+    full, lines_through = board.full, board.lines_through
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * board.cells + 100))
+
+    def won(cell, stones):
+        for mask in lines_through[cell]:
+            if stones & mask == mask:
+                return True
+        return False
+
+    def search(mine, theirs):
+        key = index(mine, theirs)
+        value = values[key]
+        if value:
+            return value
+        empty = full & ~(mine | theirs)
+        best = LOSS if empty else DRAW
+        while empty:
+            low = empty & -empty
+            empty ^= low
+            stones = mine | low
+            if won(low.bit_length() - 1, stones):
+                values[index(theirs, stones)] = LOSS
+                best = WIN
+            else:
+                # The child's value is for the opponent: WIN <-> LOSS.
+                value = 4 - search(theirs, stones)
+                if value > best:
+                    best = value
+        values[key] = best
+        return best
+
+    search(0, 0)
+    return values
+
+
+def pack(values):
+    # Four 2-bit values per byte. Each stream holds one value per byte, so the
+    # shifted streams OR together lane by lane as one big integer.
+    values = bytes(values) + bytes(-len(values) % 4)
+    length = len(values) // 4
+    packed = 0
+    for lane in range(4):
+        packed |= int.from_bytes(values[lane::4], "little") << 2 * lane
+    return packed.to_bytes(length, "little")
+
+
+def write(path, size, k, values):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, k))
+        file.write(pack(values))
+    os.replace(tmp, path)
+
+
+def generate(size, k, path=None):
+    path = path or default_path(size, k)
+    write(path, size, k, solve(size, k))
+    return path
+
+
+# --- Lookup ---
+
+class Tablebase:
+    """Perfect-play lookups from a generated table file.
+
+    The file is memory-mapped on the first lookup, so opening a large table
+    costs nothing until the computer actually has to move, and only the pages a
+    game touches are ever read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("truncated header")
+        magic, version, self.size, self.k = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a tic-tac-toe tablebase")
+        self.data = None
+        self.index = None
+
+    def value(self, mine, theirs):
+        # WIN / DRAW / LOSS for the side to move with ``mine`` against ``theirs``.
+        if self.data is None:
+            with open(self.path, "rb") as file:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index = PositionIndex(self.size)
+        key = self.index(mine, theirs)
+        return self.data[HEADER.size + (key >> 2)] >> 2 * (key & 3) & 3
+
+    def best_moves(self, board, player):
+        """Cells that keep the best result for ``player``; immediate wins first."""
+        if (board.size, board.k) != (self.size, self.k):
+            raise ValueError("tablebase is for a different board")
+        wins = board.winning_moves(player)
+        if wins:
+            return wins
+        mine, theirs = board.bits[player], board.bits[1 - player]
+        best, moves = None, []
+        for cell in board.empty_cells():
+            value = 4 - self.value(theirs, mine | 1 << cell)
+            if best is None or value > best:
+                best, moves = value, [cell]
+            elif value == best:
+                moves.append(cell)
+        return moves
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+def load(size, k, generate_missing=False):
+    # The table for this board, or None if there isn't one. Small boards solve
+    # in well under a second, so the game can build them on first run.
+    path = default_path(size, k)
+    if not os.path.exists(path):
+        if not generate_missing:
+            return None
+        generate(size, k, path)
+    return Tablebase(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every reachable tic-tac-toe position into a tablebase file")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--k", type=int, help="marks in a row to win (default: board size)")
+    parser.add_argument("--output", help="output file (default: assets/tablebase_<size>x<size>_<k>.ttb)")
+    args = parser.parse_args()
+
+    k = args.k or args.size
+    start = time.perf_counter()
+    values = solve(args.size, k)
+    solved = time.perf_counter() - start
+    path = args.output or default_path(args.size, k)
+    write(path, args.size, k, values)
+    counts = [values.count(value) for value in (WIN, DRAW, LOSS)]
+    print(f"{args.size}x{args.size}, {k} in a row: {sum(counts):,} canonical positions "
+          f"({counts[0]:,} win, {counts[1]:,} draw, {counts[2]:,} loss for the side to move) "
+          f"solved in {solved:.1f}s")
+    print(f"wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB); "
+          f"empty board is a {('unknown', 'loss', 'draw', 'win')[Tablebase(path).value(0, 0)]}")
+
+
+if __name__ == "__main__":
+    main()
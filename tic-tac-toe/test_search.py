@@ -0,0 +1,23 @@
+import random
+
+import tablebase
+from bitboard import Board
+from search import Searcher
+
+
+def test_reused_searcher_matches_tablebase(tmp_path):
+    # One Searcher for many games, as in main.py: entries left in the
+    # transposition table by earlier games must never turn into a worse move.
+    solved = tablebase.Tablebase(tablebase.generate(3, 3, str(tmp_path / "tablebase.ttb")))
+    searcher = Searcher(3, 3)
+    rng = random.Random(1)
+    for game in range(200):
+        board = Board(3, 3)
+        player = 0
+        while not board.is_over():
+            move = searcher.search(board, player, budget=10.0).move
+            best = solved.best_moves(board, player)
+            assert move in best, f"game {game}: played {move} at {board.history}, best is {best}"
+            board.play(rng.choice(board.empty_cells()), player)
+            player = 1 - player
+    solved.close()
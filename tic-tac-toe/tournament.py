@@ -0,0 +1,226 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import strategies
+from bitboard import Board
+
+# Move latencies go into log-spaced buckets (4 per doubling, from 1 us), so
+# shards merge by adding counts and millions of moves cost a few hundred ints.
+BUCKETS_PER_DOUBLING = 4
+BUCKETS = 128
+
+
+def bucket(ns):
+    if ns < 1000:
+        return 0
+    return min(BUCKETS - 1, 1 + int(math.log2(ns / 1000) * BUCKETS_PER_DOUBLING))
+
+
+def bucket_us(index):
+    # Upper edge of a bucket in microseconds.
+    return 2 ** (index / BUCKETS_PER_DOUBLING)
+
+
+def percentile(histogram, fraction):
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    target = fraction * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= target:
+            return bucket_us(index)
+    return bucket_us(BUCKETS - 1)
+
+
+# --- Games (run in the worker processes) ---
+
+_players = {}
+
+
+def play_shard(first, second, games, size, k, budget, seed):
+    """Play ``games`` games of ``first`` (moving first) against ``second``.
+
+    Returns [first wins, draws, second wins], the number of moves, and a move
+    latency histogram for each side.
+    """
+    rng = random.Random(seed)
+    for name in (first, second):
+        key = (name, size, k, budget)
+        if key not in _players:
+            _players[key] = strategies.make(name, size, k, budget, random.Random(rng.getrandbits(32)))
+    moves = (_players[(first, size, k, budget)], _players[(second, size, k, budget)])
+    histograms = ([0] * BUCKETS, [0] * BUCKETS)
+    results = [0, 0, 0]
+    total_moves = 0
+    board = Board(size, k)
+    clock = time.perf_counter_ns
+    for _ in range(games):
+        board.reset()
+        player = 0
+        while not board.is_over():
+            start = clock()
+            cell = moves[player](board, player, 1 - player)
+            histograms[player][bucket(clock() - start)] += 1
+            board.play(cell, player)
+            player = 1 - player
+        total_moves += len(board.history)
+        results[2 if board.winner == 1 else 0 if board.winner == 0 else 1] += 1
+    return first, second, results, total_moves, histograms
+
+
+def _play_shard(args):
+    return play_shard(*args)
+
+
+# --- Tournament ---
+
+def run(names, games, size, k, budget, jobs, shard_size, seed):
+    # Every ordered pair plays ``games`` games, so each pairing is played with
+    # both strategies moving first.
+    rng = random.Random(seed)
+    tasks = []
+    for first, second in itertools.product(names, repeat=2):
+        if first == second:
+            continue
+        for start in range(0, games, shard_size):
+            tasks.append((first, second, min(shard_size, games - start), size, k, budget, rng.getrandbits(32)))
+
+    started = time.perf_counter()
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            shards = list(pool.map(_play_shard, tasks))
+    else:
+        shards = [_play_shard(task) for task in tasks]
+    elapsed = time.perf_counter() - started
+
+    matrix = {a: {b: {"win": 0, "draw": 0, "loss": 0} for b in names if b != a} for a in names}
+    as_first = {a: {b: {"win": 0, "draw": 0, "loss": 0} for b in names if b != a} for a in names}
+    histograms = {name: [0] * BUCKETS for name in names}
+    total_games = total_moves = 0
+    for first, second, (first_wins, draws, second_wins), moves, (first_hist, second_hist) in shards:
+        for row, wins, losses in ((matrix[first][second], first_wins, second_wins),
+                                  (matrix[second][first], second_wins, first_wins),
+                                  (as_first[first][second], first_wins, second_wins)):
+            row["win"] += wins
+            row["draw"] += draws
+            row["loss"] += losses
+        for histogram, shard in ((histograms[first], first_hist), (histograms[second], second_hist)):
+            for index, count in enumerate(shard):
+                histogram[index] += count
+        total_games += first_wins + draws + second_wins
+        total_moves += moves
+
+    latency = {}
+    for name, histogram in histograms.items():
+        latency[name] = {
+            "moves": sum(histogram),
+            "p50_us": percentile(histogram, 0.50),
+            "p90_us": percentile(histogram, 0.90),
+            "p99_us": percentile(histogram, 0.99),
+            "max_us": percentile(histogram, 1.0),
+        }
+    return {
+        "board": {"size": size, "k": k},
+        "strategies": names,
+        "games_per_pairing": games,
+        "budget_s": budget,
+        "jobs": jobs,
+        "games": total_games,
+        "moves": total_moves,
+        "elapsed_s": elapsed,
+        "games_per_s": total_games / max(elapsed, 1e-9),
+        "matrix": matrix,
+        "as_first": as_first,
+        "latency": latency,
+    }
+
+
+def score(row):
+    games = row["win"] + row["draw"] + row["loss"]
+    return (row["win"] + 0.5 * row["draw"]) / games if games else 0.0
+
+
+def report(result, baseline=None):
+    names = result["strategies"]
+    width = max(len(name) for name in names) + 2
+    print(f"{result['games']:,} games on {result['board']['size']}x{result['board']['size']} "
+          f"({result['board']['k']} in a row) in {result['elapsed_s']:.1f}s: "
+          f"{result['games_per_s']:,.0f} games/s with {result['jobs']} jobs")
+    print("win/draw/loss, row against column:")
+    print(" " * width + "".join(f"{name:>22}" for name in names))
+    for a in names:
+        cells = []
+        for b in names:
+            row = result["matrix"][a].get(b)
+            cells.append(("-" if row is None else f"{row['win']}/{row['draw']}/{row['loss']}").rjust(22))
+        print(f"{a:<{width}}" + "".join(cells))
+    print("move latency (us):")
+    for name in names:
+        stats = result["latency"][name]
+        print(f"  {name:<{width}} p50 {stats['p50_us']:9.1f}  p90 {stats['p90_us']:9.1f}  "
+              f"p99 {stats['p99_us']:9.1f}  max {stats['max_us']:9.1f}")
+
+    if baseline is None:
+        return 0
+    # Regression check: strength (score per pairing) and throughput.
+    regressions = 0
+    for a in names:
+        for b, row in result["matrix"][a].items():
+            old = baseline.get("matrix", {}).get(a, {}).get(b)
+            if old is not None and score(row) < score(old) - 0.02:
+                regressions += 1
+                print(f"REGRESSION {a} vs {b}: score {score(old):.3f} -> {score(row):.3f}")
+    old_rate = baseline.get("games_per_s")
+    if old_rate and result["games_per_s"] < old_rate * 0.9:
+        regressions += 1
+        print(f"REGRESSION throughput: {old_rate:,.0f} -> {result['games_per_s']:,.0f} games/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless round-robin between tic-tac-toe strategies")
+    parser.add_argument("strategies", nargs="*", default=["random", "heuristic"],
+                        help=f"strategies to play ({', '.join(strategies.STRATEGIES)})")
+    parser.add_argument("--games", type=int, default=10000, help="games per ordered pairing")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--k", type=int, help="marks in a row to win (default: board size)")
+    parser.add_argument("--budget", type=float, default=0.05, help="seconds per move for search and mcts")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--shard", type=int, default=2000, help="games per worker task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="earlier JSON results to check for regressions")
+    args = parser.parse_args()
+
+    if len(args.strategies) < 2:
+        parser.error("need at least two strategies")
+    for name in args.strategies:
+        if name not in strategies.STRATEGIES:
+            parser.error(f"unknown strategy {name!r}")
+
+    k = args.k or args.size
+    if "tablebase" in args.strategies:
+        strategies.tablebase.load(args.size, k, generate_missing=args.size <= 3)  # build once, not per worker
+    result = run(args.strategies, args.games, args.size, k, args.budget, args.jobs, args.shard, args.seed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    regressions = report(result, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()